@@ -0,0 +1,124 @@
+import math
+import os
+import pickle
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+from disk_cache import CACHE_DIR
+
+FILTER_FIELDS = ("country", "type")
+TOKEN_RE = re.compile(r"\w+(?:'\w+)*")
+
+
+def index_path(name):
+    """Default on-disk location of the BM25 index for a collection."""
+    return os.path.join(CACHE_DIR, "index", f"{name}.bm25")
+
+
+def tokenize(text):
+    """Lowercased, accent-folded word tokens; keeps O'odham / d'Alene whole."""
+    text = unicodedata.normalize("NFKD", text or "").replace("’", "'")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return TOKEN_RE.findall(text)
+
+
+def document_text(doc):
+    """What we index for a doc: its content plus any entity/stakeholder names."""
+    names = [e.get("name", "") for e in doc.get("entities") or [] if isinstance(e, dict)]
+    metadata = doc.get("metadata") if isinstance(doc.get("metadata"), dict) else {}
+    names += [str(s) for s in metadata.get("stakeholders") or []]
+    return " ".join([doc.get("content") or "", *names])
+
+
+class BM25Index:
+    """Incrementally built inverted index scored with Okapi BM25.
+
+    `add` may be called again for an existing id to replace its text, so the
+    index can follow upserts as documents are ingested.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1, self.b = k1, b
+        self.postings = defaultdict(dict)  # term -> {doc index: term frequency}
+        self.ids, self.lengths, self.meta, self.terms = [], [], [], []
+        self.positions = {}  # id -> doc index
+        self.total_length = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.positions)
+
+    def add(self, doc_id, text, meta=None):
+        tf = Counter(tokenize(text))
+        with self.lock:
+            self._remove(doc_id)
+            i = len(self.ids)
+            self.ids.append(doc_id)
+            self.lengths.append(sum(tf.values()))
+            self.meta.append({f: (meta or {}).get(f) for f in FILTER_FIELDS})
+            self.terms.append(list(tf))
+            self.positions[doc_id] = i
+            self.total_length += self.lengths[i]
+            for term, n in tf.items():
+                self.postings[term][i] = n
+
+    def remove(self, doc_id):
+        with self.lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        i = self.positions.pop(doc_id, None)
+        if i is None:
+            return
+        self.total_length -= self.lengths[i]
+        self.lengths[i] = 0
+        self.ids[i] = None
+        for term in self.terms[i]:
+            del self.postings[term][i]
+        self.terms[i] = []
+
+    def search(self, query, k=10, country=None, type=None):
+        """Top-k [(id, score)] for the query terms."""
+        n = len(self)
+        if not n:
+            return []
+        avg = self.total_length / n
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for i, tf in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / avg)
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + norm)
+        wanted = {f: str(v) for f, v in (("country", country), ("type", type)) if v is not None}
+        if wanted:
+            scores = {i: s for i, s in scores.items()
+                      if all(str(self.meta[i][f]) == v for f, v in wanted.items())}
+        top = sorted(scores.items(), key=lambda kv: -kv[1])[:k]
+        return [(self.ids[i], s) for i, s in top]
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self.lock:
+            state = {k: v for k, v in self.__dict__.items() if k != "lock"}
+            state["postings"] = dict(self.postings)
+            with open(f"{path}.tmp", "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        index = cls()
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        state["postings"] = defaultdict(dict, state["postings"])
+        index.__dict__.update(state)
+        return index
+
+    @classmethod
+    def load_or_new(cls, path):
+        return cls.load(path) if os.path.exists(path) else cls()
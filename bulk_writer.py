@@ -0,0 +1,81 @@
+import logging
+import threading
+import time
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+class BulkUpserter:
+    """Buffers `$set` upserts and writes them with one unordered bulk_write.
+
+    Flushes when `batch_size` ops are queued or the oldest queued op is
+    `flush_interval` seconds old, and on exit. Thread-safe, so stage workers
+    can share one writer. Failed writes are logged per document and kept in
+    `failed` as (_id, error message).
+    """
+
+    def __init__(self, collection, batch_size=500, flush_interval=5.0):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.failed = []
+        self._ops, self._ids = [], []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer = None
+
+    def __enter__(self):
+        if self.flush_interval:
+            self._timer = threading.Thread(target=self._tick, name="bulk-flush", daemon=True)
+            self._timer.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._timer:
+            self._timer.join()
+        self.flush()
+        return False
+
+    def upsert(self, doc_id, fields):
+        with self._lock:
+            self._ops.append(UpdateOne({"_id": doc_id}, {"$set": fields}, upsert=True))
+            self._ids.append(doc_id)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._ops) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            ops, ids = self._ops, self._ids
+            self._ops, self._ids, self._oldest = [], [], None
+        if not ops:
+            return
+        try:
+            result = self.collection.bulk_write(ops, ordered=False)
+            written = result.upserted_count + result.matched_count
+            errors = []
+        except BulkWriteError as e:
+            details = e.details or {}
+            written = details.get("nUpserted", 0) + details.get("nMatched", 0)
+            errors = [(ids[err["index"]], err.get("errmsg", "")) for err in details.get("writeErrors", [])]
+        except PyMongoError as e:
+            written, errors = 0, [(doc_id, str(e)) for doc_id in ids]
+        with self._lock:
+            self.written += written
+            self.failed += errors
+        for doc_id, msg in errors:
+            logging.error(f"Upsert failed for {doc_id} in {self.collection.name}: {msg}")
+        logging.info(f"Flushed {len(ops)} upserts to {self.collection.name} ({len(errors)} failed)")
+
+    def _tick(self):
+        while not self._stop.wait(min(1.0, self.flush_interval)):
+            with self._lock:
+                due = self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+            if due:
+                self.flush()
@@ -0,0 +1,111 @@
+import numpy as np
+
+PASSAGE_CHARS = 1500  # ~400 tokens: enough context, small enough to pinpoint
+OVERLAP_CHARS = 200
+MIN_PASSAGE_CHARS = 300  # Below this, a speaker change doesn't start a new passage
+
+
+def chunk_text(text, size=PASSAGE_CHARS, overlap=OVERLAP_CHARS):
+    """[(start, end)] windows over plain text, cut at sentence ends where
+    possible, each overlapping the previous one by about `overlap` chars."""
+    spans, start = [], 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            cut = text.rfind(". ", start + size // 2, end) + 1 or text.rfind(" ", start + size // 2, end)
+            end = cut if cut > start else end
+        spans.append((start, end))
+        if end >= len(text):
+            break
+        back = text.find(" ", max(end - overlap, start + 1), end)
+        start = back + 1 if back > 0 else end
+    return spans
+
+
+def _segments(doc):
+    """Ordered text segments of a doc with their speaker/timestamp/section,
+    matching how fetchers build `content` (segment texts joined by spaces)."""
+    metadata = doc.get("metadata") or {}
+    if metadata.get("transcript_chunks"):
+        return [{"text": c.get("text", ""), "timestamp": c.get("timestamp"), "speaker": c.get("speaker")}
+                for c in metadata["transcript_chunks"]]
+    if doc.get("chunks"):  # PDFs split into sections upstream
+        return [{"text": c.get("text", ""), "section": c.get("section"), "page": c.get("page")}
+                for c in doc["chunks"]]
+    return None
+
+
+def passages_for(doc, size=PASSAGE_CHARS, overlap=OVERLAP_CHARS):
+    """Split a doc into overlapping passages with offsets into `content`.
+
+    Transcripts are cut only between transcript chunks, preferring speaker
+    changes; PDF passages never cross a section. Docs with no structure
+    fall back to sentence-aligned windows over `content`.
+    """
+    content = doc.get("content") or ""
+    segments = _segments(doc)
+    if not segments:
+        return [_passage(doc, i, content, s, e, []) for i, (s, e) in enumerate(chunk_text(content, size, overlap))]
+
+    # Character offsets of each segment within content.
+    pos = 0
+    for seg in segments:
+        seg["start"], seg["end"] = pos, pos + len(seg["text"])
+        pos = seg["end"] + 1
+
+    groups, current = [], []
+    for seg in segments:
+        if current:
+            prev = current[-1]
+            length = seg["end"] - current[0]["start"]
+            new_section = seg.get("section") != prev.get("section")
+            new_speaker = (seg.get("speaker") != prev.get("speaker")
+                           and prev["end"] - current[0]["start"] >= MIN_PASSAGE_CHARS)
+            if new_section or new_speaker or length > size:
+                groups.append(current)
+                # Carry the last short segment over as overlap, within a section.
+                tail = prev if not new_section and len(prev["text"]) <= overlap else None
+                current = [tail] if tail and not new_speaker else []
+        current.append(seg)
+    if current:
+        groups.append(current)
+
+    passages = []
+    for group in groups:
+        start, end = group[0]["start"], group[-1]["end"]
+        if end - start > size:  # One oversized segment: window inside it
+            for s, e in chunk_text(content[start:end], size, overlap):
+                passages.append(_passage(doc, len(passages), content, start + s, start + e, group))
+        else:
+            passages.append(_passage(doc, len(passages), content, start, end, group))
+    return passages
+
+
+def _passage(doc, index, content, start, end, group):
+    passage = {
+        "_id": f"{doc['_id']}:{index}",
+        "doc_id": doc["_id"],
+        "index": index,
+        "country": doc.get("country"),
+        "type": doc.get("type"),
+        "text": content[start:end],
+        "start": start,
+        "end": end,
+    }
+    if group and group[0].get("timestamp") is not None:
+        passage["timestamp"] = group[0]["timestamp"]
+        passage["end_timestamp"] = group[-1]["timestamp"]
+    speakers = list(dict.fromkeys(s["speaker"] for s in group if s.get("speaker")))
+    if speakers:
+        passage["speakers"] = speakers
+    if group and group[0].get("section") is not None:
+        passage["section"] = group[0]["section"]
+        passage["page"] = group[0].get("page")
+    return passage
+
+
+def mean_vector(vectors):
+    """Unit-length mean of passage vectors: one doc-level embedding that
+    covers the whole text instead of its head."""
+    mean = np.mean(np.asarray(vectors, dtype=np.float32), axis=0)
+    return (mean / max(float(np.linalg.norm(mean)), 1e-12)).tolist()
@@ -4,8 +4,14 @@ from datetime import datetime
 from youtube_transcript_api import YouTubeTranscriptApi
 from pymongo import MongoClient
 import openai
-import spacy
+from openai import OpenAI
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from embeddings import EmbeddingService
+from entities import load_ner, extract_entities
+from chunking import chunk_text, mean_vector
+from llm_cache import get_llm_cache
+from summarize import summarize
+from keywords import get_keywords
 
 # --- Environment Setup ---
 openai.api_key = os.getenv('OPENAI_KEY')
@@ -13,34 +19,20 @@ client = MongoClient(os.getenv('MONGO_URI'))
 db = client['prism_db']
 vector_coll = db['vectors']
 crisis_cards_coll = db['crisis_cards']
+embedder = EmbeddingService(OpenAI(api_key=os.getenv('OPENAI_KEY')), model='text-embedding-ada-002')
 
 # Load NLP tools
-nlp = spacy.load('en_core_web_sm')
+nlp = load_ner()
 sentiment_analyzer = SentimentIntensityAnalyzer()
 
 # --- Helper Functions ---
 def detect_country(title):
-    """Extract country from video title"""
-    country_map = {
-        'mexico': 'Mexico', 'california': 'USA', 'texas': 'USA', 'new york': 'USA',
-        'us senate': 'USA', 'us house': 'USA', 'canada': 'Canada', 
-        'ontario': 'Canada', 'british columbia': 'Canada'
-    }
-    title_lower = title.lower()
-    for key, country in country_map.items():
-        if key in title_lower:
-            return country
-    return 'Unknown'
+    """Extract country from video title (config/keywords.yaml)"""
+    return get_keywords().scan(title, ['country']).best('country', 'Unknown')
 
 def extract_topic(title):
-    """Extract topic from video title"""
-    if any(word in title.lower() for word in ['energy', 'grid', 'carbon']):
-        return 'energy_policy'
-    elif any(word in title.lower() for word in ['agriculture', 'water']):
-        return 'agriculture_policy'
-    elif any(word in title.lower() for word in ['budget', 'finance']):
-        return 'fiscal_policy'
-    return 'regulatory_policy'
+    """Extract topic from video title (config/keywords.yaml)"""
+    return get_keywords().scan(title, ['topic']).best('topic', 'regulatory_policy')
 
 # --- Transcript Fetch (Your existing function, adapted) ---
 def fetch_transcript(video_id: str, languages=["en", "es"]) -> str:
@@ -61,27 +53,20 @@ def process_and_embed(video_data):
     if not transcript:
         return None
         
-    # Extract entities
-    doc = nlp(transcript[:5000])  # Limit for spaCy processing
-    entities = [{'name': ent.text, 'type': ent.label_} 
-                for ent in doc.ents if ent.label_ in ['PERSON', 'ORG', 'GPE']]
-    unique_entities = list({e['name']: e for e in entities}.values())[:10]  # Top 10
+    # Extract entities (full transcript, chunked)
+    unique_entities = next(extract_entities([transcript], nlp))[:10]  # Top 10
     
-    # Generate embedding
+    # Generate embedding (mean over passages, so the whole transcript counts)
     try:
-        response = openai.Embedding.create(
-            input=transcript[:2000], 
-            model='text-embedding-ada-002'
-        )
-        vector = response['data'][0]['embedding']
+        vector = mean_vector(embedder.embed_many([transcript[s:e] for s, e in chunk_text(transcript)]))
     except Exception as e:
         print(f"Embedding failed for {video_id}: {e}")
         return None
     
     # Calculate urgency
     sentiment = sentiment_analyzer.polarity_scores(transcript)['compound']
-    urgency_keywords = ['crisis', 'emergency', 'urgent', 'critical', 'dispute', 'protest']
-    urgency = abs(sentiment) * (2 if any(k in transcript.lower() for k in urgency_keywords) else 1)
+    urgent = get_keywords().scan(transcript, ['urgency']).any('urgency')
+    urgency = abs(sentiment) * (2 if urgent else 1)
     
     # Create document for vectors collection
     doc = {
@@ -108,11 +93,17 @@ def process_and_embed(video_data):
     return doc
 
 # --- Crisis Card Generator ---
+# Bump when the crisis card prompt changes
+CARD_PROMPT_VERSION = 2
+# Tokens of extractive summary sent in place of the content's first 1500 chars
+CARD_CONTENT_TOKENS = 500
+
 def generate_crisis_card(doc):
     """Generate crisis card from processed document"""
+    content = summarize(doc['content'], CARD_CONTENT_TOKENS, entities=[e['name'] for e in doc.get('entities', [])])
     prompt = f"""From YouTube legislative hearing on {doc['topic']} in {doc['country']}:
 Title: {doc['metadata']['title']}
-Content: {doc['content'][:1500]}
+Content: {content}
 
 Generate JSON:
 {{
@@ -129,7 +120,7 @@ Generate JSON:
 
 Focus on actionable insights for traders, ESG desks, and policy watchers."""
 
-    try:
+    def ask():
         response = openai.ChatCompletion.create(
             model='gpt-4o-mini',
             messages=[
@@ -137,7 +128,14 @@ Focus on actionable insights for traders, ESG desks, and policy watchers."""
                 {'role': 'user', 'content': prompt}
             ]
         )
-        card_json = json.loads(response.choices[0].message.content)
+        return json.loads(response.choices[0].message.content)
+
+    try:
+        # Cached on the content, not urgency/timestamp, which change every run
+        key = get_llm_cache().key('gpt-4o-mini', CARD_PROMPT_VERSION, doc['_id'], doc['topic'], doc['country'],
+                                  doc['metadata']['title'], content)
+        card_json = get_llm_cache().call(key, ask)
+        card_json.update(urgency=doc['urgency'], timestamp=doc['timestamp'])
         
         # Boost urgency for high-impact terms
         if any(k in card_json['signal'].lower() for k in ['reform', 'regulation', 'policy change']):
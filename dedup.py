@@ -0,0 +1,140 @@
+import os
+import pickle
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from bm25 import tokenize
+from disk_cache import CACHE_DIR
+
+NUM_PERM = 128
+BANDS, ROWS = 16, 8  # NUM_PERM = BANDS * ROWS; candidates from ~0.7 Jaccard up
+THRESHOLD = 0.8  # estimated Jaccard at which two docs are the same document
+SHINGLE = 5  # words per shingle
+RETENTION_DAYS = 30
+INDEX_PATH = os.path.join(CACHE_DIR, "index", "dedup.lsh")
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(1)
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text, size=SHINGLE):
+    """Hashed word n-grams; case, accents and punctuation don't matter."""
+    words = tokenize(text)
+    if len(words) < size:
+        words = words + [""] * (size - len(words))
+    return np.array(
+        sorted({zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}),
+        dtype=np.uint64)
+
+
+def minhash(text):
+    """NUM_PERM-long MinHash signature of a text's shingle set."""
+    hashes = shingles(text) % _PRIME
+    return ((hashes[:, None] * _A + _B) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+
+class LSHIndex:
+    """Banded MinHash LSH over document signatures, kept across runs.
+
+    Entries older than RETENTION_DAYS are pruned on save, so the index stays
+    bounded while still catching re-uploads and re-publications for a month.
+    """
+
+    def __init__(self):
+        self.buckets = [{} for _ in range(BANDS)]  # band -> {band bytes: [doc id]}
+        self.signatures = {}  # doc id -> (signature, added_at)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.signatures)
+
+    @staticmethod
+    def _bands(signature):
+        return [signature[b * ROWS:(b + 1) * ROWS].tobytes() for b in range(BANDS)]
+
+    def query(self, signature, threshold=THRESHOLD, exclude=None):
+        """(doc id, similarity) of the closest indexed doc at or above `threshold`,
+        other than `exclude` (a re-fetched doc must not match itself)."""
+        with self.lock:
+            candidates = {doc_id for band, key in zip(self.buckets, self._bands(signature))
+                          for doc_id in band.get(key, ()) if doc_id != exclude}
+            scored = [(doc_id, similarity(signature, self.signatures[doc_id][0])) for doc_id in candidates]
+        best = max(scored, key=lambda s: s[1], default=None)
+        return best if best and best[1] >= threshold else None
+
+    def add(self, doc_id, signature):
+        with self.lock:
+            if doc_id in self.signatures:
+                return
+            self.signatures[doc_id] = (signature, time.time())
+            for band, key in zip(self.buckets, self._bands(signature)):
+                band.setdefault(key, []).append(doc_id)
+
+    def prune(self, max_age_days=RETENTION_DAYS):
+        cutoff = time.time() - max_age_days * 86400
+        with self.lock:
+            stale = {doc_id for doc_id, (_, added) in self.signatures.items() if added < cutoff}
+            if not stale:
+                return
+            for doc_id in stale:
+                del self.signatures[doc_id]
+            for band in self.buckets:
+                for key in list(band):
+                    band[key] = [d for d in band[key] if d not in stale]
+                    if not band[key]:
+                        del band[key]
+
+    def save(self, path=INDEX_PATH):
+        self.prune()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self.lock:
+            with open(f"{path}.tmp", "wb") as f:
+                pickle.dump((self.buckets, self.signatures), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load_or_new(cls, path=INDEX_PATH):
+        index = cls()
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                index.buckets, index.signatures = pickle.load(f)
+        return index
+
+
+def source_ref(raw):
+    metadata = raw.get("metadata") or {}
+    return {"_id": raw["_id"], "type": raw.get("type"), "url": metadata.get("url") or raw.get("url")}
+
+
+def fold_duplicates(raws, index, seen, threshold=THRESHOLD):
+    """Split raw docs into (canonical docs to process, {canonical id: [source refs]}).
+
+    A doc whose signature matches one in `index` (processed on a previous
+    day) or in `seen` (kept earlier in this run) is dropped and recorded as
+    another source of that canonical doc; every kept doc is its own first
+    source. Kept docs go into `seen` only: add them to `index` once their
+    signal and card are written, so a doc that fails is retried next run.
+    """
+    kept, refs = [], {}
+    for raw in raws:
+        if not raw.get("content"):
+            continue
+        signature = minhash(raw["content"])
+        match = seen.query(signature, threshold) or index.query(signature, threshold, exclude=raw["_id"])
+        if match:
+            refs.setdefault(match[0], []).append(source_ref(raw))
+            continue
+        seen.add(raw["_id"], signature)
+        refs.setdefault(raw["_id"], []).append(source_ref(raw))
+        kept.append(raw)
+    return kept, refs
@@ -0,0 +1,87 @@
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.getenv("PRISM_CACHE_DIR", ".cache")
+
+
+class DiskCache:
+    """SQLite-backed bytes cache, evicting least-recently-used entries once
+    the stored values exceed `max_bytes`. With `ttl` (seconds), entries also
+    expire that long after they were written. Safe to share between threads."""
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024, ttl=None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value BLOB, size INTEGER, used REAL, created REAL)"
+        )
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(cache)")]
+        if "created" not in columns:  # caches written before TTL support
+            self._db.execute("ALTER TABLE cache ADD COLUMN created REAL")
+        self._db.execute("CREATE INDEX IF NOT EXISTS cache_used ON cache(used)")
+        self._db.commit()
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        # Rows from before TTL support have no `created` and never expire.
+        fresh_since = time.time() - self.ttl if self.ttl else None
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                marks = ",".join("?" * len(part))
+                if fresh_since is None:
+                    rows = self._db.execute(f"SELECT key, value FROM cache WHERE key IN ({marks})", part)
+                else:
+                    rows = self._db.execute(
+                        f"SELECT key, value FROM cache WHERE key IN ({marks})"
+                        " AND (created IS NULL OR created >= ?)", [*part, fresh_since])
+                found.update(rows.fetchall())
+            if found:
+                now = time.time()
+                self._db.executemany("UPDATE cache SET used=? WHERE key=?", [(now, k) for k in found])
+                self._db.commit()
+        return found
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    def set_many(self, items):
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, size, used, created) VALUES (?, ?, ?, ?, ?)",
+                [(k, v, len(v), now, now) for k, v in items.items()],
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        if self.ttl:
+            self._db.execute("DELETE FROM cache WHERE created < ?", (time.time() - self.ttl,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop the oldest entries until we're back under 90% of the budget.
+        excess = total - int(self.max_bytes * 0.9)
+        stale, freed = [], 0
+        for key, size in self._db.execute("SELECT key, size FROM cache ORDER BY used"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._db.executemany("DELETE FROM cache WHERE key=?", stale)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
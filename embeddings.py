@@ -0,0 +1,102 @@
+import hashlib
+import logging
+import os
+import unicodedata
+from array import array
+from collections import Counter
+
+from tenacity import retry, stop_after_attempt, wait_exponential
+
+from disk_cache import CACHE_DIR, DiskCache
+
+# OpenAI caps a request at 2048 inputs / ~300k tokens; stay under both.
+MAX_BATCH_INPUTS = 2048
+MAX_BATCH_TOKENS = 250_000
+# Per-input limit is 8191 tokens; longer texts are embedded in pieces this
+# size (by estimate_tokens) and their vectors averaged.
+MAX_INPUT_TOKENS = 8000
+
+
+def normalize(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 chars/token for English; 3 keeps Spanish/French safely under budget.
+    return len(text) // 3 + 1
+
+
+def split_input(text: str):
+    """`text` in pieces of at most MAX_INPUT_TOKENS (estimated)."""
+    size = (MAX_INPUT_TOKENS - 1) * 3
+    return [text[i:i + size] for i in range(0, len(text), size)] or [text]
+
+
+def combine(parts):
+    """Length-weighted mean of [(length, vector)], L2-normalized."""
+    if len(parts) == 1:
+        return parts[0][1]
+    total = sum(n for n, _ in parts)
+    mean = [sum(n * v[i] for n, v in parts) / total for i in range(len(parts[0][1]))]
+    norm = sum(x * x for x in mean) ** 0.5 or 1.0
+    return [x / norm for x in mean]
+
+
+class EmbeddingService:
+    """Embeds texts in packed batches, caching vectors on disk by
+    (model, sha256 of normalized text) so unchanged content is never re-sent."""
+
+    def __init__(self, client, model="text-embedding-3-small", cache_path=None,
+                 max_cache_bytes=1024 * 1024 * 1024, max_batch_tokens=MAX_BATCH_TOKENS,
+                 max_batch_inputs=MAX_BATCH_INPUTS):
+        self.client = client
+        self.model = model
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_inputs = max_batch_inputs
+        self.cache = DiskCache(cache_path or os.path.join(CACHE_DIR, "embeddings.sqlite"), max_cache_bytes)
+
+    def key(self, text: str) -> str:
+        return f"{self.model}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def embed(self, text: str):
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts):
+        """Vectors for `texts`, in order. Only cache misses hit the API."""
+        texts = [normalize(t) for t in texts]
+        keys = [self.key(t) for t in texts]
+        found = self.cache.get_many(keys)
+
+        missing = {k: t for k, t in zip(keys, texts) if k not in found}
+        if missing:
+            logging.info(f"Embedding {len(missing)} texts ({len(texts) - len(missing)} cached)")
+            pieces = [(k, p) for k, t in missing.items() for p in split_input(t)]
+            expected = Counter(k for k, _ in pieces)
+            parts = {}  # key -> [(piece length, vector)]
+            for batch in self._batches(pieces):
+                vectors = self._request([p for _, p in batch])
+                for (k, p), v in zip(batch, vectors):
+                    parts.setdefault(k, []).append((len(p), v))
+                done = {k for k, _ in batch if len(parts[k]) == expected[k]}
+                fresh = {k: array("f", combine(parts.pop(k))).tobytes() for k in done}
+                self.cache.set_many(fresh)
+                found.update(fresh)
+
+        return [array("f", found[k]).tolist() for k in keys]
+
+    def _batches(self, items):
+        batch, tokens = [], 0
+        for key, text in items:
+            n = estimate_tokens(text)
+            if batch and (len(batch) >= self.max_batch_inputs or tokens + n > self.max_batch_tokens):
+                yield batch
+                batch, tokens = [], 0
+            batch.append((key, text))
+            tokens += n
+        if batch:
+            yield batch
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=2, max=15))
+    def _request(self, texts):
+        resp = self.client.embeddings.create(model=self.model, input=texts)
+        return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
@@ -0,0 +1,57 @@
+import spacy
+
+NER_LABELS = ("PERSON", "ORG", "GPE")
+# Components the entity extraction never reads. In the en_core_web_sm/md/lg
+# pipelines "ner" embeds its own tok2vec layer; the shared "tok2vec" only
+# feeds the tagger and parser, so it goes too.
+UNUSED_PIPES = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+# Keep each spaCy doc small so long PDFs are split rather than truncated.
+CHUNK_CHARS = 20_000
+
+
+def load_ner(model="en_core_web_sm"):
+    return spacy.load(model, exclude=UNUSED_PIPES)
+
+
+def split_chunks(text, size=CHUNK_CHARS):
+    """Split `text` into pieces of at most `size` chars, preferring to cut
+    at a sentence end, then at whitespace."""
+    chunks, start = [], 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            cut = text.rfind(". ", start, end)
+            if cut <= start:
+                cut = text.rfind(" ", start, end)
+            if cut > start:
+                end = cut + 1
+        chunks.append(text[start:end])
+        start = end
+    return chunks
+
+
+def extract_entities(texts, nlp, labels=NER_LABELS, batch_size=32, n_process=1, chunk_chars=CHUNK_CHARS):
+    """Yield one deduplicated [{"name", "type"}] list per text, in order.
+
+    All texts are chunked and streamed through a single `nlp.pipe`, so with
+    `n_process` > 1 spaCy spreads the chunks over that many processes.
+    """
+    seen = [0]
+
+    def chunks():
+        for i, text in enumerate(texts):
+            seen[0] = i + 1
+            for chunk in split_chunks(text or "", chunk_chars):
+                yield chunk, i
+
+    current, ents = 0, {}
+    for doc, i in nlp.pipe(chunks(), as_tuples=True, batch_size=batch_size, n_process=n_process):
+        while current < i:
+            yield list(ents.values())
+            ents, current = {}, current + 1
+        for ent in doc.ents:
+            if ent.label_ in labels:
+                ents.setdefault(ent.text, {"name": ent.text, "type": ent.label_})
+    while current < seen[0]:
+        yield list(ents.values())
+        ents, current = {}, current + 1
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+
+from disk_cache import CACHE_DIR
+
+
+class HttpCache:
+    """Per-URL validators (ETag / Last-Modified), content hash and a JSON
+    `payload` (parsed links, extracted text) from the last successful fetch.
+
+    One small JSON file per URL, replaced atomically, so threads and
+    processes can share a cache directory.
+    """
+
+    def __init__(self, name, directory=None):
+        self.dir = directory or os.path.join(CACHE_DIR, "http", name)
+        os.makedirs(self.dir, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.dir, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def entry(self, url):
+        try:
+            with open(self._path(url)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, url, entry):
+        path = self._path(url)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({**entry, "url": url}, f)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def validators(entry):
+        """Conditional-GET headers for a cached entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def describe(resp, sha256):
+        return {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "sha256": sha256,
+        }
+
+
+def get_parsed(session, cache, url, parse, **kwargs):
+    """GET `url` conditionally and return `parse(content)`.
+
+    On a 304, or a 200 whose body hashes the same as last time, the cached
+    parse result is returned and `parse` is not called. `parse` must return
+    something JSON-serializable.
+    """
+    entry = cache.entry(url)
+    headers = {**kwargs.pop("headers", {}), **cache.validators(entry)}
+    resp = session.get(url, headers=headers, **kwargs)
+    if resp.status_code == 304 and "payload" in entry:
+        return entry["payload"]
+    resp.raise_for_status()
+
+    digest = hashlib.sha256(resp.content).hexdigest()
+    if digest == entry.get("sha256") and "payload" in entry:
+        payload = entry["payload"]
+    else:
+        payload = parse(resp.content)
+    cache.save(url, {**HttpCache.describe(resp, digest), "payload": payload})
+    return payload
+
+
+class KnownUrls:
+    """Persistent set of URLs already confirmed to exist (e.g. by HEAD)."""
+
+    def __init__(self, name, directory=None):
+        directory = directory or os.path.join(CACHE_DIR, "http")
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{name}.json")
+        self.lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self.urls = set(json.load(f))
+        except (OSError, ValueError):
+            self.urls = set()
+
+    def __contains__(self, url):
+        return url in self.urls
+
+    def add_all(self, urls):
+        with self.lock:
+            self.urls.update(urls)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(sorted(self.urls), f)
+            os.replace(tmp, self.path)
+
+
+class JsonMemo:
+    """Persistent dict of JSON values, for memoizing lookups between runs."""
+
+    def __init__(self, name, directory=None):
+        directory = directory or os.path.join(CACHE_DIR, "http")
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{name}.json")
+        self.lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def update(self, items):
+        with self.lock:
+            self.data.update(items)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.data, f)
+            os.replace(tmp, self.path)
@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+import yaml
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CONFIG_PATH = os.getenv("PRISM_HTTP_CONFIG", "config/http.yaml")
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimitedSession(requests.Session):
+    """requests.Session with keep-alive pools, retries that honor Retry-After,
+    and a token bucket per host so each site gets the rate we promised it."""
+
+    def __init__(self, config):
+        super().__init__()
+        self.config = config
+        self.timeout = config.get("timeout", 30)
+        retry_cfg, pool_cfg = config.get("retry", {}), config.get("pool", {})
+        retry = Retry(
+            total=retry_cfg.get("total", 3),
+            backoff_factor=retry_cfg.get("backoff_factor", 1.0),
+            status_forcelist=retry_cfg.get("status_forcelist", [429, 500, 502, 503, 504]),
+            allowed_methods=retry_cfg.get("methods", ["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,  # Hand the last response back; callers raise_for_status()
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_cfg.get("hosts", 20),
+            pool_maxsize=pool_cfg.get("connections", 10),
+            max_retries=retry,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        if config.get("user_agent"):
+            self.headers["User-Agent"] = config["user_agent"]
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+
+    def limiter(self, host):
+        with self._buckets_lock:
+            if host not in self._buckets:
+                limits = self._limits_for(host)
+                self._buckets[host] = TokenBucket(limits.get("rate", 5), limits.get("burst", 1))
+            return self._buckets[host]
+
+    def _limits_for(self, host):
+        hosts = self.config.get("hosts") or {}
+        parts = host.split(".")
+        for i in range(len(parts) - 1):
+            limits = hosts.get(".".join(parts[i:]))
+            if limits:
+                return limits
+        return self.config.get("default", {})
+
+    def request(self, method, url, *args, **kwargs):
+        self.limiter(urlparse(url).hostname or "").acquire()
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, *args, **kwargs)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def load_config(path=CONFIG_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+
+def get_session():
+    """Process-wide RateLimitedSession configured from config/http.yaml."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = RateLimitedSession(load_config())
+        return _session
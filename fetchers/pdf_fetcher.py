@@ -1,83 +1,204 @@
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
 import pdfplumber
 import tempfile
-import os
 import time
+import os
 import hashlib  # For robust IDs if needed
+import re
+import multiprocessing
+from fetchers.http_session import get_session
+from fetchers.http_cache import HttpCache, JsonMemo, KnownUrls, get_parsed
+from keywords import get_keywords
 
-def download_and_extract(url, max_chars=50000):
-    """Download PDF from URL and extract text."""
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0 (compatible; PRISM-Bot/1.0)'}  # Polite UA
-        resp = requests.get(url, headers=headers, timeout=30)
+session = get_session()  # Pooled, per-host rate limited (config/http.yaml)
+pdf_cache = HttpCache("pdfs")  # Validators, content hash and extracted text per PDF URL
+index_cache = HttpCache("index")  # Parsed links per index page
+known_pdfs = KnownUrls("probed_pdfs")  # PDF URLs that answered HEAD 200 on an earlier run
+missing_pdfs = JsonMemo("missing_pdfs")  # PDF URL -> time it last answered HEAD 404/410
+# Seconds before a missing PDF is probed again; sittings and gaceta
+# documents are often posted a day or so after their number appears.
+MISSING_TTL = float(os.getenv('PRISM_PDF_MISSING_TTL', 24 * 3600))
+bill_pdfs = JsonMemo("congress_bill_pdfs")  # "congress/type/number/updateDate" -> PDF URL ('' if none)
+CHUNK_SIZE = 256 * 1024
+MAX_CHARS = 50000
+# A line that opens a new section of a gazette, bill or decree: a numbered
+# Artículo/Section/Part/Chapter/Title/Schedule heading, or TRANSITORIOS.
+SECTION_RE = re.compile(
+    r"^(?:(?:ART[IÍ]CULO|Art[ií]culo|ARTICLE|Article|SECTION|Section|PART|Part|CAP[IÍ]TULO|Cap[ií]tulo|"
+    r"CHAPTER|Chapter|T[IÍ]TULO|TITLE|ANEXO|Anexo|SCHEDULE|Schedule)\s+(?:\d+|[IVXLC]+|[A-Z])\b"
+    r"|TRANSITORIOS?$)")
+
+def _cached_text(entry, max_chars):
+    """Sections extracted last time (plain text from older cache entries
+    becomes one section-less chunk)."""
+    if "payload" in entry and entry.get("max_chars", 0) >= max_chars:
+        payload = entry["payload"]
+        if isinstance(payload, str):
+            return [{"text": payload[:max_chars], "page": None, "section": None}]
+        return payload
+    return None
+
+def download_to_temp(url, max_chars=MAX_CHARS):
+    """Stream `url` to a temp file, unless it is unchanged since the last run.
+
+    Returns (path, entry). When the server answers 304, or the downloaded
+    bytes hash the same as before, path is None and entry["payload"] holds
+    the text extracted last time; otherwise entry is the new cache record
+    to save once the text is extracted.
+    """
+    entry = pdf_cache.entry(url)
+    cached = _cached_text(entry, max_chars)
+    headers = HttpCache.validators(entry) if cached is not None else {}
+    with session.get(url, stream=True, headers=headers) as resp:
+        if resp.status_code == 304 and cached is not None:
+            return None, entry
         resp.raise_for_status()
-        
+        digest = hashlib.sha256()
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-            tmp.write(resp.content)
-            tmp_path = tmp.name
-        
-        text = ""
-        with pdfplumber.open(tmp_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                text += page_text + "\n"
-        
-        os.unlink(tmp_path)
-        
-        # Truncate and clean
-        text = ' '.join(text.split())[:max_chars]  # Basic clean, limit
-        if not text.strip():
+            try:
+                for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                    tmp.write(chunk)
+                    digest.update(chunk)
+            except Exception:
+                os.unlink(tmp.name)
+                raise
+        fresh = HttpCache.describe(resp, digest.hexdigest())
+    if cached is not None and fresh["sha256"] == entry.get("sha256"):
+        os.unlink(tmp.name)
+        return None, entry
+    return tmp.name, {**fresh, "max_chars": max_chars}
+
+def extract_sections(path, max_chars=MAX_CHARS):
+    """[{text, page, section}] in reading order, whitespace-normalized.
+
+    A chunk ends at every page break and at every section heading line
+    (Artículo 5, PART 2, TRANSITORIOS...); its `section` is the last heading
+    seen. Chunk texts joined by single spaces give the doc's content, and
+    together stay within `max_chars`.
+    """
+    chunks, total, section = [], 0, None
+
+    def add(lines, page):
+        nonlocal total
+        text = ' '.join(lines)[:max(0, max_chars - total)]
+        if text:
+            chunks.append({"text": text, "page": page, "section": section})
+            total += len(text) + 1
+
+    with pdfplumber.open(path) as pdf:
+        for number, page in enumerate(pdf.pages, 1):
+            lines = [' '.join(line.split()) for line in (page.extract_text() or "").splitlines()]
+            page.close()  # Drop pdfplumber's per-page object cache
+            current = []
+            for line in filter(None, lines):
+                if SECTION_RE.match(line):
+                    add(current, number)
+                    current, section = [], line[:80]
+                current.append(line)
+            add(current, number)
+            if total >= max_chars:
+                break
+    return chunks
+
+def extract_text(path, max_chars=MAX_CHARS):
+    """Extract whitespace-normalized text, stopping once `max_chars` is reached."""
+    return ' '.join(c["text"] for c in extract_sections(path, max_chars))
+
+def extract_pdf(url, path, max_chars=MAX_CHARS):
+    """Extract sections from the downloaded `path`, then delete it."""
+    try:
+        chunks = extract_sections(path, max_chars)
+        if not any(c["text"].strip() for c in chunks):
             raise ValueError("No extractable text")
-        
-        return text
+        return chunks
     except Exception as e:
         print(f"❌ Extraction failed for {url}: {e}")
         return None
+    finally:
+        os.unlink(path)
+
+def download_and_extract(url, max_chars=MAX_CHARS):
+    """Download PDF from URL and extract text (cached while the PDF is unchanged)."""
+    try:
+        path, entry = download_to_temp(url, max_chars)
+    except Exception as e:
+        print(f"❌ Download failed for {url}: {e}")
+        return None
+    if path is None:
+        chunks = _cached_text(entry, max_chars)
+    else:
+        chunks = extract_pdf(url, path, max_chars)
+        if chunks:
+            pdf_cache.save(url, {**entry, "payload": chunks})
+    return ' '.join(c["text"] for c in chunks) if chunks else None
+
+def _head_status(url):
+    try:
+        return session.head(url, timeout=10).status_code
+    except Exception:
+        return None
+
+def probe_urls(urls, deadline=30, max_workers=8):
+    """The subset of `urls` that exist, HEAD-probed concurrently.
+
+    URLs confirmed on earlier runs are not probed again, nor are URLs that
+    answered 404/410 within the last MISSING_TTL seconds. Probes still
+    running after `deadline` seconds count as missing for this run only.
+    """
+    now = time.time()
+    good = {url for url in urls if url in known_pdfs}
+    pending = [url for url in urls if url not in good and now - missing_pdfs.get(url, 0) >= MISSING_TTL]
+    if pending:
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {pool.submit(_head_status, url): url for url in pending}
+        done, not_done = wait(futures, timeout=deadline)
+        pool.shutdown(wait=False, cancel_futures=True)
+        found = {futures[f] for f in done if f.result() == 200}
+        missing = {futures[f]: now for f in done if f.result() in (404, 410)}
+        if not_done:
+            print(f"⏱️ {len(not_done)} probes missed the {deadline}s deadline")
+        known_pdfs.add_all(found)
+        if missing:
+            missing_pdfs.update(missing)
+        good |= found
+    return good
 
 def get_country_from_url(url):
-    """Infer country from URL domain."""
-    parsed = urlparse(url)
-    if 'gazette.gc.ca' in parsed.netloc or 'ourcommons.ca' in parsed.netloc:
-        return 'Canada'
-    elif 'govinfo.gov' in parsed.netloc or 'congress.gov' in parsed.netloc:
-        return 'USA'
-    elif 'diputados.gob.mx' in parsed.netloc or 'senado.gob.mx' in parsed.netloc or 'dof.gob.mx' in parsed.netloc:
-        return 'Mexico'
-    return 'Unknown'
+    """Infer country from URL domain (`domain` in config/keywords.yaml)."""
+    return get_keywords().scan(urlparse(url).netloc, ['domain']).best('domain', 'Unknown')
+
+def _parse_gazette_index(content):
+    """[(date, url)] for every dated PDF link on a Gazette index page."""
+    soup = BeautifulSoup(content, 'html.parser')
+    found = []
+    for link in soup.find_all('a', href=True):
+        href = link['href']
+        if href.endswith('.pdf') and '/pdf/' in href:
+            found.append((href.split('/')[-2], urljoin("https://gazette.gc.ca", href)))
+    return found
 
 def get_latest_canada_gazette_pdfs(num_days=7):
     """Scrape latest Gazette Part I PDFs."""
     year = datetime.now().year
     url = f"https://gazette.gc.ca/rp-pr/p1/{year}/index-eng.html"
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
+
     pdf_urls = []
     cutoff = datetime.now() - timedelta(days=num_days)
-    for link in soup.find_all('a', href=True):
-        href = link['href']
-        if href.endswith('.pdf') and '/pdf/' in href:
-            date_str = href.split('/')[-2]
-            try:
-                doc_date = datetime.strptime(date_str, '%Y-%m-%d')
-                if doc_date >= cutoff:
-                    full_url = urljoin("https://gazette.gc.ca", href)
-                    pdf_urls.append(full_url)
-            except ValueError:
-                continue
+    for date_str, full_url in get_parsed(session, index_cache, url, _parse_gazette_index):
+        try:
+            doc_date = datetime.strptime(date_str, '%Y-%m-%d')
+            if doc_date >= cutoff:
+                pdf_urls.append(full_url)
+        except ValueError:
+            continue
     return pdf_urls[:3]
 
-def get_latest_hansard_pdfs(num_sittings=3):
-    """Scrape latest Hansard sittings (updated to 45-1 for Sep 2025)."""
-    parliament, session = 45, 1
-    index_url = f"https://www.ourcommons.ca/documentviewer/en/{parliament}-{session}/house/hansard-index"
-    response = requests.get(index_url)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
-    pdf_urls = []
+def _parse_hansard_index(content):
+    """Sitting numbers linked from a Hansard index, newest first."""
+    soup = BeautifulSoup(content, 'html.parser')
     sittings = set()
     # Parse sitting links (table-based; look for sitting-N)
     for link in soup.find_all('a', href=True):
@@ -86,153 +207,244 @@ def get_latest_hansard_pdfs(num_sittings=3):
             sitting_match = href.split('sitting-')[1].split('/')[0]
             if sitting_match.isdigit():
                 sittings.add(int(sitting_match))
-    
-    sittings = sorted(list(sittings), reverse=True)
-    for sitting in sittings[:num_sittings]:
-        pdf_url = f"https://www.ourcommons.ca/Content/TopMenu/PDFs/1/HANSARD-{parliament}-{session}-{sitting}-E.pdf"
-        try:
-            if requests.head(pdf_url, timeout=10).status_code == 200:
-                pdf_urls.append(pdf_url)
-        except:
-            continue
-    return pdf_urls
+    return sorted(sittings, reverse=True)
+
+def get_latest_hansard_pdfs(num_sittings=3, lookback=30):
+    """Scrape latest Hansard sittings (updated to 45-1 for Sep 2025).
+
+    Probes the newest `lookback` sittings and returns the first
+    `num_sittings` whose PDF exists.
+    """
+    parliament, parl_session = 45, 1
+    index_url = f"https://www.ourcommons.ca/documentviewer/en/{parliament}-{parl_session}/house/hansard-index"
+    sittings = get_parsed(session, index_cache, index_url, _parse_hansard_index)
+
+    candidates = [f"https://www.ourcommons.ca/Content/TopMenu/PDFs/1/HANSARD-{parliament}-{parl_session}-{sitting}-E.pdf"
+                  for sitting in sittings[:lookback]]
+    good = probe_urls(candidates)
+    return [url for url in candidates if url in good][:num_sittings]
 
 def get_latest_federal_register_pdfs(num_docs=3):
     """Fetch latest Federal Register PDFs via API."""
     api_url = "https://www.federalregister.gov/api/v1/documents.json"
     params = {'per_page': num_docs, 'order': 'newest', 'fields[]': ['pdf_url']}
-    response = requests.get(api_url, params=params)
+    response = session.get(api_url, params=params)
     data = response.json()
     return [doc['pdf_url'] for doc in data['results'] if doc.get('pdf_url')]
 
-def get_latest_congress_bills_pdfs(api_key='DEMO_KEY', num_bills=3):
-    """Fetch latest bills PDFs (use real key for prod)."""
+def _bill_pdf_url(bill, api_key):
+    """PDF URL of a bill's latest text version ('' if it has none yet)."""
+    congress = bill['congress']
+    bill_type = bill['billType']
+    bill_num = bill['number']
+    text_url = f"https://api.congress.gov/v3/bill/{congress}/{bill_type}/{bill_num}/text"
+    text_params = {'format': 'pdf', 'linkType': 'pdf', 'api_key': api_key}
+    text_response = session.get(text_url, params=text_params)
+    text_response.raise_for_status()
+    text_data = text_response.json()
+    if 'textVersions' in text_data and text_data['textVersions']:
+        latest_version = text_data['textVersions'][0]
+        return latest_version.get('pdfUrl', '')
+    return ''
+
+def get_latest_congress_bills_pdfs(api_key='DEMO_KEY', num_bills=3, max_workers=8):
+    """Fetch latest bills PDFs (use real key for prod).
+
+    Per-bill text lookups run concurrently (paced by the api.congress.gov
+    limit in config/http.yaml) and are memoized by congress, type, number
+    and updateDate, so only bills that changed are looked up again.
+    """
     bills_url = "https://api.congress.gov/v3/bill"
     params = {'limit': num_bills, 'api_key': api_key, 'format': 'json', 'sort': 'lastUpdated'}
-    response = requests.get(bills_url, params=params)
+    response = session.get(bills_url, params=params)
     bills_data = response.json().get('searchResults', {}).get('bills', [])
-    
-    pdf_urls = []
-    for bill in bills_data:
-        congress = bill['congress']
-        bill_type = bill['billType']
-        bill_num = bill['number']
-        text_url = f"https://api.congress.gov/v3/bill/{congress}/{bill_type}/{bill_num}/text"
-        text_params = {'format': 'pdf', 'linkType': 'pdf', 'api_key': api_key}
-        text_response = requests.get(text_url, params=text_params)
-        text_data = text_response.json()
-        if 'textVersions' in text_data and text_data['textVersions']:
-            latest_version = text_data['textVersions'][0]
-            pdf_url = latest_version.get('pdfUrl', '')
-            if pdf_url:
-                pdf_urls.append(pdf_url)
+
+    keys = ["/".join(str(bill.get(k, '')) for k in ('congress', 'billType', 'number', 'updateDate'))
+            for bill in bills_data]
+    changed = [(key, bill) for key, bill in zip(keys, bills_data) if key not in bill_pdfs]
+    if changed:
+        found = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_bill_pdf_url, bill, api_key): key for key, bill in changed}
+            for future in as_completed(futures):
+                try:
+                    found[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"❌ Bill text lookup failed for {futures[future]}: {e}")
+        bill_pdfs.update(found)
+
+    pdf_urls = [bill_pdfs.get(key) for key in keys if bill_pdfs.get(key)]
     return pdf_urls[:num_bills]
 
+def _parse_dof_index(content):
+    """[(date, url)] for the nota links under the top DOF fecha sections."""
+    soup = BeautifulSoup(content, 'html.parser')
+    found = []
+    # Find fecha sections and codnota links
+    for div in soup.find_all('div', class_='fecha')[:5]:  # Top recent
+        date_text = div.get_text()
+        if 'Fecha: ' in date_text:
+            date_str = (date_text.split('Fecha: ')[1].split() or [''])[0]
+            for link in div.find_all('a', href=True):
+                href = link['href']
+                if 'nota_to_doc.php?codnota=' in href:
+                    codnota = href.split('codnota=')[1].split('&')[0]
+                    found.append((date_str, f"https://www.dof.gob.mx/nota_to_doc.php?codnota={codnota}"))
+    return found
+
 def get_latest_dof_pdfs(num_days=1):
     """Scrape DOF for latest PDFs (daily)."""
     url = "https://www.dof.gob.mx/"
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
+
     pdf_urls = []
     cutoff = datetime.now() - timedelta(days=num_days)
-    # Find fecha sections and codnota links
-    for div in soup.find_all('div', class_='fecha')[:5]:  # Top recent
-        date_text = div.get_text()
-        if 'Fecha:' in date_text:
-            try:
-                date_str = date_text.split('Fecha: ')[1].split()[0]
-                doc_date = datetime.strptime(date_str, '%d/%m/%Y')
-                if doc_date >= cutoff:
-                    for link in div.find_all('a', href=True):
-                        href = link['href']
-                        if 'nota_to_doc.php?codnota=' in href:
-                            codnota = href.split('codnota=')[1].split('&')[0]
-                            full_pdf_url = f"https://www.dof.gob.mx/nota_to_doc.php?codnota={codnota}"
-                            pdf_urls.append(full_pdf_url)
-            except ValueError:
-                continue
+    for date_str, full_pdf_url in get_parsed(session, index_cache, url, _parse_dof_index):
+        try:
+            doc_date = datetime.strptime(date_str, '%d/%m/%Y')
+            if doc_date >= cutoff:
+                pdf_urls.append(full_pdf_url)
+        except ValueError:
+            continue
     return pdf_urls[:3]
 
+def _parse_diputados_index(content):
+    """[(date code, url)] for the debate PDF links on the cronica page."""
+    soup = BeautifulSoup(content, 'html.parser')
+    found = []
+    for link in soup.find_all('a', href=True):
+        href = link['href']
+        if href.startswith('/pdf/66/2025/') and href.endswith('.pdf'):
+            # Extract date from filename, e.g., 250921-1.pdf -> 250921
+            date_code = href.split('/')[-1].replace('.pdf', '').split('-')[0]
+            found.append((date_code, urljoin("https://cronica.diputados.gob.mx", href)))
+    return found
+
 def get_latest_diputados_pdfs(num_days=7):
     """Scrape main cronica page for latest debate PDFs (/pdf/66/2025/...)."""
     url = "https://cronica.diputados.gob.mx/"
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
+
     pdf_urls = []
     cutoff = datetime.now() - timedelta(days=num_days)
-    for link in soup.find_all('a', href=True):
-        href = link['href']
-        if href.startswith('/pdf/66/2025/') and href.endswith('.pdf'):
-            # Extract date from filename, e.g., 250921-1.pdf -> 2025-09-21
-            date_code = href.split('/')[-1].replace('.pdf', '').split('-')[0]
-            try:
-                # Assume YYMMDD format: 250921 -> 2025-09-21
-                year = f"20{date_code[:2]}"
-                month_day = date_code[2:]
-                date_str = f"{year}-{month_day[:2]}-{month_day[2:]}"
-                doc_date = datetime.strptime(date_str, '%Y-%m-%d')
-                if doc_date >= cutoff:
-                    full_url = urljoin("https://cronica.diputados.gob.mx", href)
-                    pdf_urls.append(full_url)
-            except ValueError:
-                continue
+    for date_code, full_url in get_parsed(session, index_cache, url, _parse_diputados_index):
+        try:
+            # Assume YYMMDD format: 250921 -> 2025-09-21
+            year = f"20{date_code[:2]}"
+            month_day = date_code[2:]
+            date_str = f"{year}-{month_day[:2]}-{month_day[2:]}"
+            doc_date = datetime.strptime(date_str, '%Y-%m-%d')
+            if doc_date >= cutoff:
+                pdf_urls.append(full_url)
+        except ValueError:
+            continue
     return pdf_urls[:3]  # Fallback to 3 recent
 
-def get_latest_senado_pdfs(leg=66, num_docs=3):
-    """Scrape Senado gaceta for latest PDFs."""
-    list_url = f"https://www.senado.gob.mx/{leg}/gaceta_del_senado"
-    response = requests.get(list_url)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
-    pdf_urls = []
+def _parse_senado_index(content):
+    """Gaceta document ids linked from the Senado list page, newest first."""
+    soup = BeautifulSoup(content, 'html.parser')
     doc_links = soup.find_all('a', href=lambda h: h and '/documento/' in h and h.endswith('.pdf'))
     ids = [link['href'].split('/documento/')[1].replace('.pdf', '') for link in doc_links if link['href']]
-    ids = sorted(set(ids), reverse=True, key=lambda x: int(x) if x.isdigit() else 0)
-    for doc_id in ids[:num_docs]:
-        pdf_url = f"https://www.senado.gob.mx/{leg}/gaceta_del_senado/documento/{doc_id}.pdf"
-        try:
-            if requests.head(pdf_url, timeout=10).status_code == 200:
-                pdf_urls.append(pdf_url)
-        except:
-            continue
-    return pdf_urls
+    return sorted(set(ids), reverse=True, key=lambda x: int(x) if x.isdigit() else 0)
 
-def fetch_gov_pdfs(api_key='DEMO_KEY'):
-    """Full fetch: Get URLs, download/extract, return list of {'id', 'title', 'transcript', 'type':'pdf'}."""
-    all_docs = []
-    
+def get_latest_senado_pdfs(leg=66, num_docs=3, lookback=30):
+    """Scrape Senado gaceta for latest PDFs.
+
+    Probes the newest `lookback` document ids and returns the first
+    `num_docs` whose PDF exists.
+    """
+    list_url = f"https://www.senado.gob.mx/{leg}/gaceta_del_senado"
+    ids = get_parsed(session, index_cache, list_url, _parse_senado_index)
+
+    candidates = [f"https://www.senado.gob.mx/{leg}/gaceta_del_senado/documento/{doc_id}.pdf"
+                  for doc_id in ids[:lookback]]
+    good = probe_urls(candidates)
+    return [url for url in candidates if url in good][:num_docs]
+
+# Extraction processes; each is spawned and re-imports the caller's __main__.
+PDF_WORKERS = int(os.getenv('PRISM_PDF_WORKERS', min(4, os.cpu_count() or 1)))
+
+def fetch_gov_pdfs(api_key='DEMO_KEY', max_workers=PDF_WORKERS):
+    """Full fetch: Get URLs, download/extract, return list of {'_id', 'title', 'content', 'chunks', 'type':'pdf', ...}.
+
+    Sources are discovered concurrently, PDFs are downloaded on a thread
+    pool and extracted in a process pool (pdfplumber is CPU-bound).
+    """
     sources = [
-        ('Canada Gazette', get_latest_canada_gazette_pdfs()),
-        ('Canada Hansard', get_latest_hansard_pdfs()),
-        ('USA Federal Register', get_latest_federal_register_pdfs()),
-        ('USA Congress Bills', get_latest_congress_bills_pdfs(api_key)),
-        ('Mexico DOF', get_latest_dof_pdfs()),
-        ('Mexico Diputados', get_latest_diputados_pdfs()),
-        ('Mexico Senado', get_latest_senado_pdfs())
+        ('Canada Gazette', get_latest_canada_gazette_pdfs),
+        ('Canada Hansard', get_latest_hansard_pdfs),
+        ('USA Federal Register', get_latest_federal_register_pdfs),
+        ('USA Congress Bills', lambda: get_latest_congress_bills_pdfs(api_key)),
+        ('Mexico DOF', get_latest_dof_pdfs),
+        ('Mexico Diputados', get_latest_diputados_pdfs),
+        ('Mexico Senado', get_latest_senado_pdfs)
     ]
-    
-    for source_name, urls in sources:
-        country = get_country_from_url(urls[0]) if urls else 'Unknown'
-        for url in urls[:5]:  # Max 5 per source
+
+    jobs = []  # (source_name, country, url)
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        discovered = [(name, pool.submit(find)) for name, find in sources]
+        for source_name, future in discovered:
+            try:
+                urls = future.result()
+            except Exception as e:
+                print(f"❌ Discovery failed for {source_name}: {e}")
+                continue
+            country = get_country_from_url(urls[0]) if urls else 'Unknown'
+            jobs += [(source_name, country, url) for url in urls[:5]]  # Max 5 per source
+
+    # Downloads are I/O on the shared rate-limited session (threads);
+    # extraction is CPU-bound pdfplumber work (processes). PDFs unchanged
+    # since the last run come straight from the cache. Workers are spawned,
+    # not forked: under --staged this runs inside a multi-threaded stage.
+    results = [None] * len(jobs)
+    spawn = multiprocessing.get_context("spawn")
+    with ThreadPoolExecutor(max_workers=8) as downloads, \
+            ProcessPoolExecutor(max_workers=max_workers, mp_context=spawn) as extractors:
+        downloading = {}
+        for i, (source_name, _, url) in enumerate(jobs):
             print(f"📥 Processing {source_name}: {url}")
-            text = download_and_extract(url)
-            if text:
-                filename = url.split('/')[-1].replace('.pdf', '')
-                doc_id = filename or hashlib.md5(url.encode()).hexdigest()[:8]
-                title = f"{country} {source_name} - {filename.split('-')[-1] if '-' in filename else filename}"
-                
-                doc = {
-                    'id': doc_id,
-                    'title': title,
-                    'transcript': text,
-                    'type': 'pdf'
-                }
-                all_docs.append(doc)
-                print(f"✅ Extracted {len(text)} chars for {title}")
-            
-            time.sleep(1)  # Rate limit
-    
+            downloading[downloads.submit(download_to_temp, url)] = i
+        extracting = {}
+        for future in as_completed(downloading):
+            i = downloading[future]
+            url = jobs[i][2]
+            try:
+                path, entry = future.result()
+            except Exception as e:
+                print(f"❌ Download failed for {url}: {e}")
+                continue
+            if path is None:
+                print(f"♻️ Unchanged, using cached text: {url}")
+                results[i] = _cached_text(entry, MAX_CHARS)
+                continue
+            extracting[extractors.submit(extract_pdf, url, path)] = (i, entry)
+        for future in as_completed(extracting):
+            i, entry = extracting[future]
+            results[i] = future.result()
+            if results[i]:
+                pdf_cache.save(jobs[i][2], {**entry, "payload": results[i]})
+
+    all_docs = []
+    for (source_name, country, url), chunks in zip(jobs, results):
+        if chunks:
+            text = ' '.join(c["text"] for c in chunks)
+            filename = url.split('/')[-1].replace('.pdf', '')
+            doc_id = filename or hashlib.md5(url.encode()).hexdigest()[:8]
+            title = f"{country} {source_name} - {filename.split('-')[-1] if '-' in filename else filename}"
+
+            # `_id`/`content`/`chunks` are what the pipeline reads; `chunks`
+            # keeps passages inside one section (chunking.passages_for).
+            doc = {
+                '_id': doc_id,
+                'id': doc_id,
+                'title': title,
+                'transcript': text,
+                'content': text,
+                'chunks': chunks,
+                'country': country,
+                'metadata': {'url': url, 'title': title},
+                'type': 'pdf'
+            }
+            all_docs.append(doc)
+            print(f"✅ Extracted {len(text)} chars for {title}")
+
     print(f"✅ Fetched {len(all_docs)} PDF docs")
     return all_docs
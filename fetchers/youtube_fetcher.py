@@ -1,44 +1,79 @@
 import requests
 import json
+import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from fetchers.http_session import get_session
 
-def fetch_youtube_transcripts(video_ids, token, country, topic):
-    """
-    Fetch transcripts using youtube-transcript.io API.
-    video_ids: List of YouTube video IDs (e.g., ['jNQXAC9IVRw']).
-    Returns list of dicts matching vectors schema.
-    """
-    url = "https://www.youtube-transcript.io/api/transcripts"
+API_URL = "https://www.youtube-transcript.io/api/transcripts"
+BATCH_SIZE = 50  # API limit: 50 per call
+
+def _post_batch(ids, token, delay=0):
+    """POST one batch of IDs; returns the API's 'results' list."""
+    time.sleep(delay)  # Backoff before a retried batch
     headers = {
         "Authorization": f"Basic {token}",
         "Content-Type": "application/json"
     }
-    data = {"ids": video_ids[:50]}  # API limit: 50 per call
-    try:
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        response.raise_for_status()  # Raise on 4xx/5xx
-        results = response.json()  # Assume {'results': [{'id': 'vid', 'transcript': [{'text': 'chunk', 'start': 0}]}]}
-        
-        transcripts = []
-        for result in results.get('results', []):
-            video_id = result.get('id')
-            transcript_chunks = result.get('transcript', [])
-            chunks = [{'timestamp': f"{chunk.get('start', 0):.2f}", 'text': chunk.get('text', ''), 'speaker': 'Unknown'} for chunk in transcript_chunks]
-            transcripts.append({
-                '_id': video_id,
-                'type': 'youtube',
-                'country': country,
-                'topic': topic,
-                'content': ' '.join(c['text'] for c in chunks),
-                'metadata': {
-                    'url': f"https://youtube.com/watch?v={video_id}",
-                    'title': 'API Title Placeholder',  # Enhance with /api/videos if needed
-                    'date': datetime.now().isoformat(),
-                    'transcript_chunks': chunks
-                },
-                'timestamp': datetime.now().isoformat()
-            })
-        return transcripts
-    except requests.exceptions.RequestException as e:
-        print(f"API error: {e}")
-        return []  # Graceful fallback
+    response = get_session().post(API_URL, headers=headers, data=json.dumps({"ids": ids}))
+    response.raise_for_status()  # Raise on 4xx/5xx
+    return response.json().get('results', [])  # Assume {'results': [{'id': 'vid', 'transcript': [{'text': 'chunk', 'start': 0}]}]}
+
+def iter_transcript_results(video_ids, token, max_workers=4, attempts=3):
+    """
+    Yield raw API results for any number of IDs, as each 50-ID batch finishes.
+    Batches run concurrently; a failed batch is retried on its own (with
+    backoff) and dropped after `attempts` tries without affecting the rest.
+    """
+    batches = [video_ids[i:i + BATCH_SIZE] for i in range(0, len(video_ids), BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {pool.submit(_post_batch, batch, token): (batch, 1) for batch in batches}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch, attempt = pending.pop(future)
+                try:
+                    results = future.result()
+                except requests.exceptions.RequestException as e:
+                    if attempt < attempts:
+                        print(f"API error (batch of {len(batch)}, attempt {attempt}): {e}; retrying")
+                        pending[pool.submit(_post_batch, batch, token, 2 ** attempt)] = (batch, attempt + 1)
+                    else:
+                        print(f"API error: giving up on batch starting {batch[0]}: {e}")
+                    continue
+                yield from results
+
+def to_transcript_doc(result, doc_type, country, topic, title):
+    """Map one API result to the vectors schema."""
+    video_id = result.get('id')
+    transcript_chunks = result.get('transcript', [])
+    chunks = [{'timestamp': f"{chunk.get('start', 0):.2f}", 'text': chunk.get('text', ''), 'speaker': 'Unknown'} for chunk in transcript_chunks]
+    return {
+        '_id': video_id,
+        'type': doc_type,
+        'country': country,
+        'topic': topic,
+        'content': ' '.join(c['text'] for c in chunks),
+        'metadata': {
+            'url': f"https://youtube.com/watch?v={video_id}",
+            'title': title,
+            'date': datetime.now().isoformat(),
+            'transcript_chunks': chunks
+        },
+        'timestamp': datetime.now().isoformat()
+    }
+
+def iter_youtube_transcripts(video_ids, token, country, topic, max_workers=4):
+    """Stream transcript docs as their batches complete."""
+    for result in iter_transcript_results(video_ids, token, max_workers):
+        yield to_transcript_doc(result, 'youtube', country, topic,
+                                'API Title Placeholder')  # Enhance with /api/videos if needed
+
+def fetch_youtube_transcripts(video_ids, token, country, topic, max_workers=4):
+    """
+    Fetch transcripts using youtube-transcript.io API.
+    video_ids: List of YouTube video IDs (e.g., ['jNQXAC9IVRw']), any length;
+    they are sent in concurrent batches of 50.
+    Returns list of dicts matching vectors schema.
+    """
+    return list(iter_youtube_transcripts(video_ids, token, country, topic, max_workers))
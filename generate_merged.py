@@ -1,86 +1,194 @@
-import json, glob
+import hashlib
+import json
+import os
+import re
 
-merged = []
+from disk_cache import CACHE_DIR
 
-# Loop through all JSON files in the data folders
-for file in glob.glob("data/**/**/*.json", recursive=True):
+DATA_DIR = "data"
+MERGED_PATH = "merged_data.ndjson"
+# Parsed objects per source file, reused while the file is unchanged.
+SHARD_DIR = os.path.join(CACHE_DIR, "merged")
+MANIFEST_PATH = os.path.join(SHARD_DIR, "manifest.json")
+
+
+def iter_merged(path=MERGED_PATH):
+    """Stream merged objects one at a time from the NDJSON output."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def source_files(root=DATA_DIR):
+    """Country JSON files under data/, skipping the duplicate data/data/ copy."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        if os.path.normpath(dirpath) == os.path.normpath(root):
+            dirnames[:] = [d for d in dirnames if d != "data"]
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.endswith(".json"):
+                yield os.path.join(dirpath, name)
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "_", str(text).lower()).strip("_")
+
+
+def parse_file(file):
+    """Merged objects for one data file, each with a stable `_id`."""
     with open(file) as f:
         data = json.load(f)
 
-        # --- Task 1: YouTube transcripts ---
-        if "transcripts" in file:
-            # handle Argentina/Colombia/Canada naming differences
-            task_keys = [
-                "task1_youtube_transcripts",
-                "task1_youtube_transcripts_argentina",
-                "task1_youtube_transcripts_colombia",
-                "task1_youtube_transcripts_canada"
-            ]
-            for key in task_keys:
-                if key in data:
-                    for t in data[key]:
-                        merged.append({
-                            "type": "transcript",
-                            "country": t["metadata"]["jurisdiction"],
-                            "content": " ".join([c["text"] for c in t["transcript_chunks"]]),
-                            "metadata": {
-                                "date": t.get("date", ""),
-                                "topic": t["metadata"].get("topic", ""),
-                                "stakeholders": t["metadata"].get("stakeholders_mentioned", [])
-                            }
-                        })
-
-        # --- Task 2: PDFs ---
-        if "pdfs" in file:
-            task_keys = [
-                "task2_government_pdfs",
-                "task2_government_pdfs_argentina",
-                "task2_government_pdfs_colombia",
-                "task2_government_pdfs_canada"
-            ]
-            for key in task_keys:
-                if key in data:
-                    for p in data[key]:
-                        merged.append({
-                            "type": "pdf",
-                            "country": p.get("jurisdiction", "unknown"),
-                            "content": " ".join([c["text"] for c in p.get("chunks", [])]),
-                            "metadata": {
-                                "date": p.get("date", ""),
-                                "topic": p.get("title", "")
-                            }
-                        })
-
-        # --- Task 3: Entities ---
-        if "entities" in file:
-            entities = data.get("entities", [])
-            for e in entities:
-                merged.append({
-                    "type": "entity",
-                    "country": e.get("region", "unknown"),
-                    "content": e.get("name", ""),
+    # --- Task 1: YouTube transcripts ---
+    if "transcripts" in file:
+        # handle Argentina/Colombia/Canada naming differences
+        task_keys = [
+            "task1_youtube_transcripts",
+            "task1_youtube_transcripts_argentina",
+            "task1_youtube_transcripts_colombia",
+            "task1_youtube_transcripts_canada"
+        ]
+        for key in task_keys:
+            for t in data.get(key, []):
+                yield {
+                    "_id": f"transcript:{t['video_id']}",
+                    "type": "transcript",
+                    "country": t["metadata"]["jurisdiction"],
+                    "content": " ".join([c["text"] for c in t["transcript_chunks"]]),
+                    "metadata": {
+                        "date": t.get("date", ""),
+                        "topic": t["metadata"].get("topic", ""),
+                        "stakeholders": t["metadata"].get("stakeholders_mentioned", [])
+                    }
+                }
+
+    # --- Task 2: PDFs ---
+    if "pdfs" in file:
+        task_keys = [
+            "task2_government_pdfs",
+            "task2_government_pdfs_argentina",
+            "task2_government_pdfs_colombia",
+            "task2_government_pdfs_canada"
+        ]
+        for key in task_keys:
+            for p in data.get(key, []):
+                yield {
+                    "_id": f"pdf:{p['document_id']}",
+                    "type": "pdf",
+                    "country": p.get("jurisdiction", "unknown"),
+                    "content": " ".join([c["text"] for c in p.get("chunks", [])]),
                     "metadata": {
-                        "role": e.get("role", "N/A"),
-                        "influence_score": e.get("influence_score", 0),
-                        "stance": e.get("stance", "unknown")
+                        "date": p.get("date", ""),
+                        "topic": p.get("title", "")
                     }
-                })
-
-        # --- Task 4: Comparison ---
-        if "comparison" in file:
-            # The comparison is usually a dict with law/ICSID information
-            if isinstance(data, dict) and len(data) > 0:
-                comparison = list(data.values())[0]
-                if isinstance(comparison, dict):
-                    merged.append({
-                        "type": "comparison",
-                        "country": comparison.get("law_indigenous_consultation", {}).get("title", "unknown"),
-                        "content": comparison.get("focus_analysis", ""),
-                        "metadata": comparison.get("law_indigenous_consultation", {})
-                    })
-
-# Write out combined JSON
-with open("merged_data.json", "w") as out:
-    json.dump(merged, out, indent=2)
-
-print(f"Merged {len(merged)} objects into merged_data.json")
+                }
+
+    # --- Task 3: Entities ---
+    if "entities" in file:
+        for e in data.get("entities", []):
+            region = e.get("region", "unknown")
+            yield {
+                "_id": f"entity:{_slug(e.get('name', ''))}:{_slug(region)}",
+                "type": "entity",
+                "country": region,
+                "content": e.get("name", ""),
+                "metadata": {
+                    "role": e.get("role", "N/A"),
+                    "influence_score": e.get("influence_score", 0),
+                    "stance": e.get("stance", "unknown")
+                }
+            }
+
+    # --- Task 4: Comparison ---
+    if "comparison" in file:
+        # The comparison is usually a dict with law/ICSID information
+        if isinstance(data, dict) and len(data) > 0:
+            key, comparison = next(iter(data.items()))
+            if isinstance(comparison, dict):
+                # Several countries share a top-level key, so qualify it by file.
+                source = os.path.splitext(os.path.relpath(file, DATA_DIR))[0]
+                yield {
+                    "_id": f"comparison:{_slug(source)}:{_slug(key)}",
+                    "type": "comparison",
+                    "country": comparison.get("law_indigenous_consultation", {}).get("title", "unknown"),
+                    "content": comparison.get("focus_analysis", ""),
+                    "metadata": comparison.get("law_indigenous_consultation", {})
+                }
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _shard_path(file, sha):
+    # Keyed by path too: comparison ids depend on the file name, not just its bytes.
+    key = hashlib.sha256(f"{file}\0{sha}".encode()).hexdigest()
+    return os.path.join(SHARD_DIR, f"{key}.ndjson")
+
+
+def merge(root=DATA_DIR, out_path=MERGED_PATH, full=False):
+    """Rebuild the NDJSON output, re-parsing only files whose mtime/size and
+    then content hash changed since the last run. Objects are streamed shard
+    by shard and deduplicated by `_id` (first occurrence wins)."""
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    manifest = {}
+    if not full and os.path.exists(MANIFEST_PATH):
+        with open(MANIFEST_PATH) as f:
+            manifest = json.load(f)
+
+    seen, stats = set(), {"parsed": 0, "reused": 0, "written": 0, "duplicates": 0}
+    new_manifest = {}
+    with open(f"{out_path}.tmp", "w") as out:
+        for file in source_files(root):
+            st = os.stat(file)
+            entry = manifest.get(file)
+            if not (entry and entry["mtime"] == st.st_mtime and entry["size"] == st.st_size):
+                sha = _sha256(file)
+                entry = {"sha256": sha} if not entry or entry["sha256"] != sha else entry
+                entry.update(mtime=st.st_mtime, size=st.st_size)
+            shard = _shard_path(file, entry["sha256"])
+            if os.path.exists(shard):
+                stats["reused"] += 1
+            else:
+                with open(f"{shard}.tmp", "w") as f:
+                    for obj in parse_file(file):
+                        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+                os.replace(f"{shard}.tmp", shard)
+                stats["parsed"] += 1
+            new_manifest[file] = entry
+
+            for obj in iter_merged(shard):
+                if obj["_id"] in seen:
+                    stats["duplicates"] += 1
+                    continue
+                seen.add(obj["_id"])
+                out.write(json.dumps(obj, ensure_ascii=False) + "\n")
+                stats["written"] += 1
+    os.replace(f"{out_path}.tmp", out_path)
+
+    # Drop shards of files that changed or disappeared.
+    live = {_shard_path(f, e["sha256"]) for f, e in new_manifest.items()}
+    for f, e in manifest.items():
+        old = _shard_path(f, e["sha256"])
+        if old not in live and os.path.exists(old):
+            os.remove(old)
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(new_manifest, f, indent=2)
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Merge data/**/*.json into NDJSON")
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and re-parse every file")
+    parser.add_argument("--out", default=MERGED_PATH)
+    args = parser.parse_args()
+
+    stats = merge(out_path=args.out, full=args.full)
+    print(f"Merged {stats['written']} objects into {args.out} "
+          f"({stats['parsed']} files parsed, {stats['reused']} unchanged, {stats['duplicates']} duplicates dropped)")
@@ -0,0 +1,78 @@
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bm25 import tokenize
+
+DIM = 768
+CHAR_NGRAMS = (3, 4, 5)
+WORD_NGRAMS = (1, 2)
+
+
+def _hash(feature):
+    # crc32 is stable across processes and runs, unlike hash().
+    return zlib.crc32(feature.encode("utf-8"))
+
+
+def features(text):
+    """Word 1-2grams plus character 3-5grams of each word, so inflections
+    and Spanish/Portuguese spellings of the same term still overlap."""
+    words = tokenize(text)
+    for n in WORD_NGRAMS:
+        for i in range(len(words) - n + 1):
+            yield "w:" + " ".join(words[i:i + n])
+    for word in words:
+        padded = f"<{word}>"
+        for n in CHAR_NGRAMS:
+            for i in range(len(padded) - n + 1):
+                yield "c:" + padded[i:i + n]
+
+
+def vectorize(text, dim=DIM):
+    """L2-normalized signed feature-hashing vector with log-scaled counts."""
+    hashes = np.fromiter((_hash(f) for f in features(text)), dtype=np.uint32)
+    vector = np.zeros(dim, dtype=np.float32)
+    if not len(hashes):
+        return vector
+    signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+    np.add.at(vector, hashes % dim, signs)
+    vector = np.sign(vector) * np.log1p(np.abs(vector))
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
+def vectorize_many(texts, dim=DIM):
+    return np.stack([vectorize(t, dim) for t in texts]) if texts else np.zeros((0, dim), dtype=np.float32)
+
+
+class HashingVectorizer:
+    """Embeds texts on local CPUs: no model download, no API, deterministic.
+
+    Batches are spread over a process pool; use as a context manager so the
+    pool is shut down.
+    """
+
+    def __init__(self, dim=DIM, processes=None):
+        self.dim = dim
+        self.processes = processes or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.processes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.pool.shutdown()
+        return False
+
+    def embed_batches(self, batches):
+        """Vectors for each batch of texts, in order. Keeps a couple of batches
+        per worker in flight, so a lazy stream of batches stays lazy."""
+        pending, ahead = deque(), 2 * self.processes
+        for batch in batches:
+            pending.append(self.pool.submit(vectorize_many, batch, self.dim))
+            if len(pending) >= ahead:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,67 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+RRF_K = 60
+# Seconds each retrieval stage may take before we fuse without it.
+BUDGETS = {"bm25": 0.05, "vector": 0.5}
+
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid")
+
+
+def rrf(rankings, k=RRF_K):
+    """Reciprocal-rank fusion of ranked id lists -> [(id, score)], best first."""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda kv: -kv[1])
+
+
+def search(query, bm25, vector_index, embed, k=10, depth=50, country=None, type=None, budgets=None):
+    """Hybrid keyword + semantic search.
+
+    Runs BM25 over content/entity names and a vector search (embedding the
+    query with `embed`) in parallel, each against its own latency budget,
+    and fuses whatever finished in time with reciprocal-rank fusion.
+    Returns ([{"id", "score", "bm25_rank", "vector_rank"}], {stage: seconds}).
+    """
+    budgets = {**BUDGETS, **(budgets or {})}
+
+    def timed(fn, *args, **kwargs):
+        start = time.perf_counter()
+        return fn(*args, **kwargs), time.perf_counter() - start
+
+    def vector_stage():
+        return vector_index.search(embed(query), depth, country=country, type=type)
+
+    start = time.perf_counter()
+    stages = {
+        "bm25": _pool.submit(timed, bm25.search, query, depth, country=country, type=type),
+        "vector": _pool.submit(timed, vector_stage),
+    }
+    rankings, timings = {}, {}
+    for name, future in stages.items():
+        remaining = budgets[name] - (time.perf_counter() - start)
+        done, _ = wait([future], timeout=max(remaining, 0))
+        if not done:
+            logging.warning(f"hybrid search: {name} missed its {budgets[name] * 1000:.0f}ms budget, skipped")
+            timings[name] = None
+            continue
+        try:
+            hits, timings[name] = future.result()
+        except Exception as e:
+            logging.error(f"hybrid search: {name} failed: {e}")
+            timings[name] = None
+            continue
+        rankings[name] = [doc_id for doc_id, _ in hits]
+
+    ranks = {name: {doc_id: r for r, doc_id in enumerate(ids)} for name, ids in rankings.items()}
+    fused = rrf(rankings.values())[:k]
+    timings["total"] = time.perf_counter() - start
+    results = [
+        {"id": doc_id, "score": score,
+         "bm25_rank": ranks.get("bm25", {}).get(doc_id), "vector_rank": ranks.get("vector", {}).get(doc_id)}
+        for doc_id, score in fused
+    ]
+    return results, timings
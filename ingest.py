@@ -1,40 +1,76 @@
 import weaviate
 import json
 import os
+import argparse
+from collections import deque
+from itertools import islice
+from weaviate.util import generate_uuid5
+from generate_merged import iter_merged
 
-# Connect to local Weaviate (v4 syntax with skip_init_checks)
-client = weaviate.connect_to_local(skip_init_checks=True)
-
-try:
-    # Delete existing collection if it exists
-    if client.collections.exists("RegulatoryObject"):
-        client.collections.delete("RegulatoryObject")
-    
-    # Create collection with schema
-    collection = client.collections.create(
-        name="RegulatoryObject",
-        description="Merged regulatory intel across multiple countries",
-        vectorizer_config=weaviate.classes.config.Configure.Vectorizer.text2vec_openai(),
-        properties=[
-            weaviate.classes.config.Property(name="type", data_type=weaviate.classes.config.DataType.TEXT),
-            weaviate.classes.config.Property(name="country", data_type=weaviate.classes.config.DataType.TEXT),
-            weaviate.classes.config.Property(name="content", data_type=weaviate.classes.config.DataType.TEXT),
-            weaviate.classes.config.Property(name="metadata", data_type=weaviate.classes.config.DataType.TEXT)
-        ]
-    )
-    
-    # Load your merged data
-    with open("merged_data.json") as f:
-        data = json.load(f)
-    
-    # Batch insert
-    with collection.batch.dynamic() as batch:
-        for obj in data:
-            batch.add_object(
-                properties=obj
-            )
-    
-    print(f"Ingested {len(data)} objects into Weaviate ✅")
-
-finally:
-    client.close()
+BATCH_SIZE = 256  # objects per vectorizer task in --local mode
+
+def properties(obj):
+    # _id is reserved in Weaviate and metadata is a TEXT property
+    return {k: (json.dumps(v, ensure_ascii=False) if k == "metadata" else v)
+            for k, v in obj.items() if k != "_id"}
+
+def local_vectors(objects, processes=None):
+    """(obj, vector) pairs, vectorized on local CPUs in parallel batches."""
+    from hashing_vectorizer import HashingVectorizer
+    from bm25 import document_text
+
+    pending = deque()
+
+    def batches():
+        while batch := list(islice(objects, BATCH_SIZE)):
+            pending.append(batch)
+            yield [f"{obj.get('type','')} {obj.get('country','')} {document_text(obj)}" for obj in batch]
+
+    with HashingVectorizer(processes=processes) as vectorizer:
+        for vectors in vectorizer.embed_batches(batches()):
+            yield from zip(pending.popleft(), vectors.tolist())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest merged_data.ndjson into Weaviate")
+    parser.add_argument("--local", action="store_true",
+                        help="compute vectors on local CPUs (hashing_vectorizer) instead of text2vec_openai")
+    parser.add_argument("--processes", type=int, help="vectorizer processes (default: all CPUs)")
+    args = parser.parse_args()
+
+    # Connect to local Weaviate (v4 syntax with skip_init_checks)
+    client = weaviate.connect_to_local(skip_init_checks=True)
+
+    try:
+        # Delete existing collection if it exists
+        if client.collections.exists("RegulatoryObject"):
+            client.collections.delete("RegulatoryObject")
+
+        Configure = weaviate.classes.config.Configure
+        # Create collection with schema
+        collection = client.collections.create(
+            name="RegulatoryObject",
+            description="Merged regulatory intel across multiple countries",
+            vectorizer_config=Configure.Vectorizer.none() if args.local else Configure.Vectorizer.text2vec_openai(),
+            properties=[
+                weaviate.classes.config.Property(name="type", data_type=weaviate.classes.config.DataType.TEXT),
+                weaviate.classes.config.Property(name="country", data_type=weaviate.classes.config.DataType.TEXT),
+                weaviate.classes.config.Property(name="content", data_type=weaviate.classes.config.DataType.TEXT),
+                weaviate.classes.config.Property(name="metadata", data_type=weaviate.classes.config.DataType.TEXT)
+            ]
+        )
+
+        # Stream your merged data (python generate_merged.py)
+        objects = iter_merged()
+        pairs = local_vectors(objects, args.processes) if args.local else ((obj, None) for obj in objects)
+        count = 0
+        with collection.batch.dynamic() as batch:
+            for obj, vector in pairs:
+                # Deterministic UUIDs, so re-ingesting replaces objects instead of duplicating them
+                batch.add_object(properties=properties(obj), uuid=generate_uuid5(obj["_id"]), vector=vector)
+                count += 1
+
+        failed = collection.batch.failed_objects
+        print(f"Ingested {count - len(failed)} objects into Weaviate ✅ ({len(failed)} failed)")
+
+    finally:
+        client.close()
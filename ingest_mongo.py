@@ -1,8 +1,17 @@
 import os
 import json
+import hashlib
+import argparse
+from itertools import islice
 from pymongo import MongoClient
 from openai import OpenAI
 from dotenv import load_dotenv
+from embeddings import EmbeddingService
+from bulk_writer import BulkUpserter
+from vector_codec import encode
+from disk_cache import CACHE_DIR
+from bm25 import BM25Index, document_text, index_path
+from generate_merged import MERGED_PATH, iter_merged
 
 load_dotenv(dotenv_path=".env")
 
@@ -14,27 +23,92 @@ collection = db["regulatory_objects"]
 
 # OpenAI client
 openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+embedder = EmbeddingService(openai_client, model="text-embedding-3-small")  # cost-effective + good quality
+
+BATCH_SIZE = 256  # objects embedded and written per checkpoint
+CHECKPOINT_PATH = os.path.join(CACHE_DIR, "ingest", f"{collection.name}.json")
 
 def get_embedding(text: str):
-    return openai_client.embeddings.create(
-        model="text-embedding-3-small",  # cost-effective + good quality
-        input=text
-    ).data[0].embedding
-
-# Reset collection (only while testing)
-collection.drop()
-
-# Load merged dataset
-with open("merged_data.json") as f:
-    data = json.load(f)
-
-docs = []
-for obj in data:
-    text_blob = f"{obj.get('type','')} {obj.get('country','')} {obj.get('content','')} {obj.get('metadata','')}"
-    emb = get_embedding(text_blob)
-    doc = obj.copy()
-    doc["embedding"] = emb
-    docs.append(doc)
-
-collection.insert_many(docs)
-print(f"✅ Inserted {len(docs)} docs into MongoDB Atlas with embeddings")
+    return embedder.embed(text)
+
+def embedding_text(obj):
+    return f"{obj.get('type','')} {obj.get('country','')} {obj.get('content','')} {obj.get('metadata','')}"
+
+def content_hash(obj):
+    """Changes whenever the embedded text or the embedding model does."""
+    return hashlib.sha256(f"{embedder.model}\0{embedding_text(obj)}".encode("utf-8")).hexdigest()
+
+def source_version(path):
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+def load_checkpoint(path):
+    """Lines of `path` already ingested, if the file hasn't changed since."""
+    if os.path.exists(CHECKPOINT_PATH):
+        with open(CHECKPOINT_PATH) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("version") == source_version(path):
+            return checkpoint["done"]
+    return 0
+
+def save_checkpoint(path, done):
+    os.makedirs(os.path.dirname(CHECKPOINT_PATH), exist_ok=True)
+    with open(f"{CHECKPOINT_PATH}.tmp", "w") as f:
+        json.dump({"version": source_version(path), "done": done}, f)
+    os.replace(f"{CHECKPOINT_PATH}.tmp", CHECKPOINT_PATH)
+
+def ingest(path=MERGED_PATH, batch_size=BATCH_SIZE):
+    """Stream NDJSON into Mongo in checkpointed batches.
+
+    Objects whose content_hash matches the stored one keep their embedding;
+    only new or changed objects are embedded and upserted. The keyword index
+    follows along and is saved at every checkpoint.
+    """
+    done = load_checkpoint(path)
+    if done:
+        print(f"⏩ Resuming {path} after {done} objects")
+    keywords = BM25Index.load_or_new(index_path(collection.name))
+    stats = {"embedded": 0, "unchanged": 0}
+
+    objects = islice(iter_merged(path), done, None)
+    with BulkUpserter(collection, batch_size=batch_size, flush_interval=0) as writer:
+        while batch := list(islice(objects, batch_size)):
+            hashes = [content_hash(obj) for obj in batch]
+            stored = {d["_id"]: d.get("content_hash") for d in
+                      collection.find({"_id": {"$in": [obj["_id"] for obj in batch]}}, {"content_hash": 1})}
+            changed = [(obj, h) for obj, h in zip(batch, hashes) if stored.get(obj["_id"]) != h]
+
+            vectors = embedder.embed_many([embedding_text(obj) for obj, _ in changed])
+            for (obj, h), vector in zip(changed, vectors):
+                writer.upsert(obj["_id"], {**obj, "content_hash": h, **encode(vector)})
+            for obj in batch:
+                keywords.add(str(obj["_id"]), document_text(obj), obj)
+
+            failed = len(writer.failed)
+            writer.flush()
+            if len(writer.failed) > failed:
+                raise RuntimeError(f"{len(writer.failed) - failed} writes failed; re-run to resume after object {done}")
+            done += len(batch)
+            keywords.save(index_path(collection.name))
+            save_checkpoint(path, done)
+            stats["embedded"] += len(changed)
+            stats["unchanged"] += len(batch) - len(changed)
+            print(f"✅ {done} objects ingested ({len(changed)} embedded in this batch)")
+    return {**stats, "keywords": len(keywords)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream merged_data.ndjson into MongoDB with embeddings")
+    parser.add_argument("path", nargs="?", default=MERGED_PATH)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--reset", action="store_true", help="drop the collection, keyword index and checkpoint first")
+    args = parser.parse_args()
+
+    if args.reset:
+        collection.drop()
+        for stale in (CHECKPOINT_PATH, index_path(collection.name)):
+            if os.path.exists(stale):
+                os.remove(stale)
+
+    stats = ingest(args.path, args.batch_size)
+    print(f"✅ Ingest finished: {stats['embedded']} embedded, {stats['unchanged']} unchanged, "
+          f"{stats['keywords']} docs in the keyword index")
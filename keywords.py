@@ -0,0 +1,173 @@
+import os
+import threading
+import unicodedata
+from collections import Counter, deque, namedtuple
+
+import yaml
+
+CONFIG_PATH = os.getenv("PRISM_KEYWORDS_CONFIG", "config/keywords.yaml")
+
+Hit = namedtuple("Hit", "group label term start end")
+
+
+class _FoldTable(dict):
+    """str.translate table: lowercase and strip accents, one char to one char,
+    so offsets into the folded text are offsets into the original."""
+
+    def __missing__(self, char):
+        folded = unicodedata.normalize("NFKD", chr(char))[0].lower()[:1] or chr(char)
+        self[char] = folded
+        return folded
+
+
+_FOLD = _FoldTable()
+
+
+def fold(text):
+    return (text or "").translate(_FOLD)
+
+
+def _is_word(char):
+    return char.isalnum() or char == "_"
+
+
+class Scan:
+    """Hits of one text, with per-group counts, offsets and a best label."""
+
+    def __init__(self, hits, order):
+        self.hits = hits
+        self._order = order
+
+    def __iter__(self):
+        return iter(self.hits)
+
+    def any(self, group):
+        return any(h.group == group for h in self.hits)
+
+    def counts(self, group):
+        """Counter of label -> hits."""
+        return Counter(h.label for h in self.hits if h.group == group)
+
+    def offsets(self, group):
+        """{label: [(start, end)]} into the scanned text."""
+        found = {}
+        for h in self.hits:
+            if h.group == group:
+                found.setdefault(h.label, []).append((h.start, h.end))
+        return found
+
+    def best(self, group, default=None):
+        """Label with the most hits; ties go to the label listed first."""
+        counts = self.counts(group)
+        if not counts:
+            return default
+        order = self._order.get(group, {})
+        return min(counts, key=lambda label: (-counts[label], order.get(label, len(order))))
+
+
+class KeywordEngine:
+    """Aho-Corasick matcher over {group: {label: [terms]}} dictionaries.
+
+    The automaton is built once; `scan` then finds every term of every group
+    in a single pass over the text, so cost grows with the text, not with
+    the number of terms. Matching is case- and accent-insensitive on whole
+    words. Within a group, overlapping hits resolve to the leftmost longest
+    ("new mexico" is not also "mexico").
+    """
+
+    def __init__(self, dictionaries):
+        self.goto = [{}]  # state -> {char: state}
+        self.fail = [0]
+        self.out = [[]]  # state -> [pattern index] ending there
+        self.patterns = []  # (group, label, term, length)
+        self.order = {}
+        for group, labels in (dictionaries or {}).items():
+            self.order[group] = {label: i for i, label in enumerate(labels)}
+            for label, terms in labels.items():
+                for term in terms or []:
+                    self._add(group, label, " ".join(fold(str(term)).split()))
+        self._link()
+
+    @classmethod
+    def from_yaml(cls, path=CONFIG_PATH):
+        with open(path) as f:
+            return cls(yaml.safe_load(f) or {})
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def _add(self, group, label, term):
+        if not term:
+            return
+        state = 0
+        for char in term:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.out[state].append(len(self.patterns))
+        self.patterns.append((group, label, term, len(term)))
+
+    def _link(self):
+        """Breadth-first failure links; each state also emits its suffixes' terms."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                back = self.fail[state]
+                while back and char not in self.goto[back]:
+                    back = self.fail[back]
+                self.fail[child] = self.goto[back].get(char, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find(self, text, groups=None, overlapping=False):
+        """[Hit] ordered by start, optionally only for some `groups`."""
+        folded = fold(text)
+        goto, fail, out, patterns = self.goto, self.fail, self.out, self.patterns
+        root, n = goto[0], len(folded)
+        hits, state = [], 0
+        for i, char in enumerate(folded):
+            if not state and char not in root:
+                continue
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for p in out[state]:
+                group, label, term, length = patterns[p]
+                start = i - length + 1
+                if groups and group not in groups:
+                    continue
+                if _is_word(term[0]) and start > 0 and _is_word(folded[start - 1]):
+                    continue
+                if _is_word(term[-1]) and i + 1 < n and _is_word(folded[i + 1]):
+                    continue
+                hits.append(Hit(group, label, term, start, i + 1))
+        return sorted(hits, key=lambda h: h.start) if overlapping else self._leftmost_longest(hits)
+
+    @staticmethod
+    def _leftmost_longest(hits):
+        kept, last_end = [], {}
+        for hit in sorted(hits, key=lambda h: (h.start, h.start - h.end)):
+            if hit.start >= last_end.get(hit.group, 0):
+                kept.append(hit)
+                last_end[hit.group] = hit.end
+        return kept
+
+    def scan(self, text, groups=None):
+        return Scan(self.find(text, groups), self.order)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_keywords():
+    """Process-wide KeywordEngine built from config/keywords.yaml."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = KeywordEngine.from_yaml()
+        return _engine
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import Future
+
+from disk_cache import CACHE_DIR, DiskCache
+
+LLM_CACHE_TTL = float(os.getenv("PRISM_LLM_CACHE_TTL", 30 * 86400))
+LLM_CACHE_BYTES = 256 * 1024 * 1024
+
+
+class LLMCache:
+    """Persistent cache of parsed LLM responses.
+
+    Keys come from `key(model, prompt_version, *inputs)`: bump the prompt
+    version whenever a template changes. Entries expire after `ttl` seconds
+    and the least recently used are evicted past `max_bytes`. Concurrent
+    calls for the same key share a single request (single-flight).
+    """
+
+    def __init__(self, path=None, ttl=LLM_CACHE_TTL, max_bytes=LLM_CACHE_BYTES):
+        self.cache = DiskCache(path or os.path.join(CACHE_DIR, "llm.sqlite"), max_bytes, ttl=ttl)
+        self.hits = self.misses = 0
+        self._inflight = {}  # key -> Future shared by concurrent callers
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model, prompt_version, *inputs):
+        blob = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+        return f"{model}:{prompt_version}:{hashlib.sha256(blob.encode('utf-8')).hexdigest()}"
+
+    def cached(self, key):
+        """The stored result for `key`, or None."""
+        cached = self.cache.get(key)
+        return None if cached is None else json.loads(cached)
+
+    def call(self, key, fn):
+        """Cached result of `fn()` (which must return JSON-serializable data).
+        Each caller gets its own copy; failures are not cached."""
+        cached = self.cached(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return json.loads(future.result())
+
+        try:
+            self.misses += 1
+            value = json.dumps(fn(), ensure_ascii=False).encode("utf-8")
+            self.cache.set(key, value)
+            future.set_result(value)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return json.loads(value)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Process-wide LLMCache in CACHE_DIR/llm.sqlite."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
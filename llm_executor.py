@@ -0,0 +1,140 @@
+import asyncio
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Defaults sized for gpt-4o-mini at usage tier 1.
+LLM_CONCURRENCY = int(os.getenv("PRISM_LLM_CONCURRENCY", 8))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("PRISM_LLM_RPM", 500))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("PRISM_LLM_TPM", 200_000))
+
+
+class _Budget:
+    """Async token bucket refilled at `per_minute / 60` units per second."""
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.level = per_minute
+        self.stamp = time.monotonic()
+
+    async def acquire(self, n):
+        n = min(n, self.capacity)
+        while True:
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+            self.stamp = now
+            if self.level >= n:
+                self.level -= n
+                return
+            await asyncio.sleep((n - self.level) / self.rate)
+
+
+class LLMExecutor:
+    """Runs blocking LLM calls from an asyncio priority queue.
+
+    `submit` is thread-safe and returns a concurrent.futures.Future. Work is
+    taken highest `priority` first (ties in submission order), at most
+    `concurrency` at a time, and only while the request and token budgets
+    allow. The event loop lives on a background thread; the calls themselves
+    run in a thread pool, so existing sync clients work unchanged.
+    """
+
+    def __init__(self, concurrency=LLM_CONCURRENCY, requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=LLM_TOKENS_PER_MINUTE, name="llm"):
+        self.name = name
+        self.concurrency = concurrency
+        self.started = time.monotonic()
+        self.first_result = None
+        self.submitted = self.completed = self.failed = self.max_depth = 0
+        self._order = itertools.count()
+        self._threads = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=name)
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(requests_per_minute, tokens_per_minute), name=f"{name}-loop", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        return False
+
+    @property
+    def depth(self):
+        return self._queue.qsize()
+
+    def submit(self, fn, *args, priority=0.0, tokens=0, **kwargs):
+        future = Future()
+        self.submitted += 1
+        item = (-priority, next(self._order), fn, args, kwargs, tokens, future)
+        self._loop.call_soon_threadsafe(self._enqueue, item)
+        return future
+
+    def stats(self):
+        ttfr = None if self.first_result is None else self.first_result - self.started
+        return {"submitted": self.submitted, "completed": self.completed, "failed": self.failed,
+                "queued": self.depth, "max_queue_depth": self.max_depth, "time_to_first_result": ttfr}
+
+    def shutdown(self):
+        """Finish queued work, then stop the loop and its threads."""
+        asyncio.run_coroutine_threadsafe(self._drain(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._threads.shutdown()
+        s = self.stats()
+        ttfr = "n/a" if s["time_to_first_result"] is None else f"{s['time_to_first_result']:.1f}s"
+        logging.info(f"{self.name}: {s['completed']} done, {s['failed']} failed, "
+                     f"max queue depth {s['max_queue_depth']}, first result after {ttfr}")
+
+    # --- event loop side ---
+    def _run(self, requests_per_minute, tokens_per_minute):
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.PriorityQueue()
+        self._requests = _Budget(requests_per_minute)
+        self._tokens = _Budget(tokens_per_minute)
+        self._workers = [self._loop.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._loop.call_soon(self._ready.set)
+        self._loop.run_forever()
+
+    async def _drain(self):
+        await self._queue.join()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    def _enqueue(self, item):
+        self._queue.put_nowait(item)
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    async def _worker(self):
+        while True:
+            _, _, fn, args, kwargs, tokens, future = await self._queue.get()
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                await self._requests.acquire(1)
+                await self._tokens.acquire(tokens)
+                try:
+                    result = await self._loop.run_in_executor(self._threads, lambda: fn(*args, **kwargs))
+                except Exception as e:
+                    self.failed += 1
+                    future.set_exception(e)
+                    continue
+                self.completed += 1
+                if self.first_result is None:
+                    self.first_result = time.monotonic()
+                    logging.info(f"{self.name}: first result after {self.first_result - self.started:.1f}s "
+                                 f"({self.depth} queued)")
+                elif self.completed % 25 == 0:
+                    logging.info(f"{self.name}: {self.completed} done, {self.depth} queued")
+                future.set_result(result)
+            finally:
+                self._queue.task_done()
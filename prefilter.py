@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import yaml
+
+from bm25 import tokenize
+from disk_cache import CACHE_DIR
+from hashing_vectorizer import vectorize_many
+
+CONFIG_PATH = os.getenv("PRISM_RELEVANCE_CONFIG", "config/relevance.yaml")
+ACCOUNTS_PATH = "config/accounts.yaml"
+MODEL_PATH = os.getenv("PRISM_RELEVANCE_MODEL", "config/relevance_model.npz")
+AUDIT_DIR = os.path.join(CACHE_DIR, "audit")
+# Official feeds and curated records; overridden by `exempt_types` in the config.
+EXEMPT_TYPES = ("pdf", "youtube_gov", "entity", "comparison")
+MAX_CHARS = 20000  # a doc's head is enough to judge relevance
+
+
+def doc_text(doc):
+    """Text we score: title plus body (X posts carry it as `transcript`)."""
+    metadata = doc.get("metadata") if isinstance(doc.get("metadata"), dict) else {}
+    title = doc.get("title") or metadata.get("title") or ""
+    return f"{title} {doc.get('content') or doc.get('transcript') or ''}"[:MAX_CHARS]
+
+
+class Watchlists:
+    """Whole-word/phrase matcher for the per-category watchlist terms."""
+
+    def __init__(self, categories):
+        self.terms = {}  # normalized term -> [categories]
+        for category, terms in categories.items():
+            for term in terms or []:
+                key = " ".join(tokenize(str(term)))
+                if key:
+                    self.terms.setdefault(key, []).append(category)
+        self.lengths = sorted({len(t.split()) for t in self.terms})
+
+    def match(self, tokens):
+        """{category: set of matched terms}"""
+        found = {}
+        for n in self.lengths:
+            if n == 1:  # "reforms" counts as "reform"
+                grams = set(tokens) | {t[:-1] for t in tokens if len(t) > 3 and t.endswith("s")}
+            else:
+                grams = {" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)}
+            for term in grams & self.terms.keys():
+                for category in self.terms[term]:
+                    found.setdefault(category, set()).add(term)
+        return found
+
+
+class LinearModel:
+    """Logistic regression over hashing_vectorizer features."""
+
+    def __init__(self, weights, bias=0.0):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = float(bias)
+
+    def predict(self, texts):
+        x = vectorize_many(texts, len(self.weights))
+        return 1.0 / (1.0 + np.exp(-(x @ self.weights + self.bias)))
+
+    @classmethod
+    def train(cls, texts, labels, dim=768, epochs=200, lr=0.5, l2=1e-4):
+        x = vectorize_many(texts, dim)
+        y = np.asarray(labels, dtype=np.float32)
+        w, b = np.zeros(dim, dtype=np.float32), 0.0
+        for _ in range(epochs):
+            p = 1.0 / (1.0 + np.exp(-(x @ w + b)))
+            grad = p - y
+            w -= lr * (x.T @ grad / len(y) + l2 * w)
+            b -= lr * float(grad.mean())
+        return cls(w, b)
+
+    def save(self, path):
+        np.savez(path, weights=self.weights, bias=self.bias)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data["weights"], float(data["bias"]))
+
+
+class RelevanceFilter:
+    """Scores raw docs against the watchlists before any expensive stage.
+
+    Docs scoring under `drop_below` are dropped; under `downrank_below` they
+    are kept with `relevance_weight` set, which scales their urgency (and so
+    their card priority). Both decisions are appended to an NDJSON audit log
+    with the score and the terms that matched.
+    """
+
+    def __init__(self, config_path=CONFIG_PATH, model_path=MODEL_PATH, audit_dir=AUDIT_DIR):
+        with open(config_path) as f:
+            self.config = yaml.safe_load(f) or {}
+        self.watchlists = Watchlists(self.config.get("categories", {}))
+        self.model = LinearModel.load(model_path) if model_path and os.path.exists(model_path) else None
+        self.audit_dir = audit_dir
+        self._lock = threading.Lock()
+        self._warn_uncovered()
+
+    def _warn_uncovered(self):
+        if not os.path.exists(ACCOUNTS_PATH):
+            return
+        with open(ACCOUNTS_PATH) as f:
+            accounts = (yaml.safe_load(f) or {}).get("accounts", [])
+        used = {c for a in accounts for c in a.get("categories") or [a.get("category")] if c}
+        missing = used - set(self.config.get("categories", {}))
+        if missing:
+            logging.warning(f"prefilter: no watchlist terms for account categories {sorted(missing)}")
+
+    def score(self, docs):
+        """[(score, details)] for raw docs; details says what drove the score."""
+        texts = [doc_text(d) for d in docs]
+        model_scores = self.model.predict(texts) if self.model and texts else [None] * len(texts)
+        saturation = self.config.get("saturation", 4)
+        weight = self.config.get("model_weight", 0.5)
+        results = []
+        for text, model_score in zip(texts, model_scores):
+            matches = self.watchlists.match(tokenize(text))
+            terms = set().union(*matches.values()) if matches else set()
+            keyword_score = min(1.0, len(terms) / saturation)
+            score = keyword_score if model_score is None else (1 - weight) * keyword_score + weight * float(model_score)
+            results.append((score, {
+                "keyword_score": round(keyword_score, 3),
+                "model_score": None if model_score is None else round(float(model_score), 3),
+                "categories": {c: sorted(t)[:5] for c, t in sorted(matches.items())},
+            }))
+        return results
+
+    def filter(self, docs):
+        """Docs worth processing, in order; drops and down-ranks are audited."""
+        exempt = set(self.config.get("exempt_types", EXEMPT_TYPES) or [])
+        candidates = [d for d in docs if d.get("type") not in exempt]
+        drop_below = self.config.get("drop_below", 0.15)
+        downrank_below = self.config.get("downrank_below", 0.35)
+        dropped, audit = set(), []
+        for doc, (score, details) in zip(candidates, self.score(candidates)):
+            doc["relevance"] = round(score, 3)
+            if score < drop_below:
+                decision = "drop"
+                dropped.add(id(doc))
+            elif score < downrank_below:
+                decision = "downrank"
+                doc["relevance_weight"] = self.config.get("downrank_weight", 0.5)
+            else:
+                continue
+            audit.append({"_id": doc.get("_id") or doc.get("id"), "type": doc.get("type"),
+                          "decision": decision, "score": round(score, 3), **details})
+        self._audit(audit)
+        if audit:
+            logging.info(f"prefilter: dropped {len(dropped)}, down-ranked {len(audit) - len(dropped)} of {len(docs)} docs")
+        return [d for d in docs if id(d) not in dropped]
+
+    def _audit(self, entries):
+        if not entries or not self.audit_dir:
+            return
+        now = datetime.now(timezone.utc)
+        os.makedirs(self.audit_dir, exist_ok=True)
+        path = os.path.join(self.audit_dir, f"prefilter-{now:%Y-%m-%d}.ndjson")
+        lines = "".join(json.dumps({"at": now.isoformat(), **e}, ensure_ascii=False) + "\n" for e in entries)
+        with self._lock, open(path, "a") as f:
+            f.write(lines)
+
+
+def benchmark(path, n=20000, batch=64):
+    """Score `n` docs cycled from an NDJSON file; prints docs/s and MB/s.
+    Calls score() directly, so exempt types are timed like everything else."""
+    with open(path) as f:
+        sample = [json.loads(line) for line in f if line.strip()]
+    docs = [dict(sample[i % len(sample)]) for i in range(n)]
+    relevance = RelevanceFilter(audit_dir=None)
+    start = time.perf_counter()
+    scores = [s for i in range(0, n, batch) for s, _ in relevance.score(docs[i:i + batch])]
+    elapsed = time.perf_counter() - start
+    size = sum(len(doc_text(d)) for d in docs) / 1e6
+    below = sum(s < relevance.config.get("drop_below", 0.15) for s in scores)
+    print(f"⏱️ {n} docs scored in {elapsed:.2f}s: {n / elapsed:,.0f} docs/s, {size / elapsed:.1f} MB/s "
+          f"({below} below drop threshold, model={'on' if relevance.model else 'off'})")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Relevance pre-filter tools")
+    parser.add_argument("--bench", nargs="?", const="merged_data.ndjson", help="throughput benchmark over an NDJSON file")
+    parser.add_argument("-n", type=int, default=20000, help="docs to score in the benchmark")
+    parser.add_argument("--train", help="NDJSON of labeled docs: {content, label: 0|1}")
+    args = parser.parse_args()
+
+    if args.train:
+        with open(args.train) as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        model = LinearModel.train([doc_text(r) for r in rows], [int(r["label"]) for r in rows])
+        model.save(MODEL_PATH)
+        print(f"✅ Trained on {len(rows)} labeled docs → {MODEL_PATH}")
+    if args.bench:
+        benchmark(args.bench, args.n)
@@ -1,11 +1,23 @@
 import os, json, logging
+from concurrent.futures import Future
 from datetime import datetime, timezone
 from dotenv import load_dotenv
-from pymongo import MongoClient, ASCENDING
+from pymongo import MongoClient, ASCENDING, UpdateOne
+from pymongo.errors import PyMongoError
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import spacy
 from tenacity import retry, stop_after_attempt, wait_exponential
 from openai import OpenAI
+from embeddings import EmbeddingService, estimate_tokens
+from entities import load_ner, extract_entities
+from bulk_writer import BulkUpserter
+from chunking import passages_for, mean_vector
+from vector_codec import encode
+from dedup import LSHIndex, fold_duplicates
+from llm_cache import get_llm_cache
+from llm_executor import LLMExecutor
+from prefilter import RelevanceFilter
+from summarize import summarize
+from keywords import get_keywords
 
 # --- Setup ---
 load_dotenv(".env.local")
@@ -13,27 +25,46 @@ load_dotenv(".env.local")
 OPENAI_KEY = os.getenv("OPENAI_KEY")
 MONGO_URI = os.getenv("MONGO_URI")
 
-client = OpenAI(api_key=OPENAI_KEY)
-mongo = MongoClient(MONGO_URI)
-db = mongo["rhis_prism"]
-signals = db["signals"]
-cards = db["crisis_cards"]
+# spaCy processes for batch NER; >1 forks workers, so keep at 1 in staged mode.
+NER_PROCESSES = int(os.getenv("PRISM_NER_PROCESSES", 1))
 
-nlp = spacy.load("en_core_web_sm")
-sentiment = SentimentIntensityAnalyzer()
+# Clients, models and indexes are created by setup(), not at import: the PDF
+# extraction workers are spawned and re-import this module as __mp_main__.
+client = embedder = mongo = db = signals = cards = passages = None
+nlp = sentiment = lsh = relevance = None
+
+def setup():
+    """Create the pipeline's clients, NER model and indexes (once)."""
+    global client, embedder, mongo, db, signals, cards, passages, nlp, sentiment, lsh, relevance
+    if nlp is not None:
+        return
+    client = OpenAI(api_key=OPENAI_KEY)
+    embedder = EmbeddingService(client, model="text-embedding-3-small")
+    mongo = MongoClient(MONGO_URI)
+    db = mongo["rhis_prism"]
+    signals = db["signals"]
+    cards = db["crisis_cards"]
+    passages = db["passages"]
+    nlp = load_ner()
+    sentiment = SentimentIntensityAnalyzer()
+    lsh = LSHIndex.load_or_new()
+    relevance = RelevanceFilter()
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 utc_now = lambda: datetime.now(timezone.utc).isoformat()
 
-# --- Retry wrappers ---
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(min=2, max=15))
-def embed(text: str):
-    resp = client.embeddings.create(model="text-embedding-3-small", input=text[:8000])
-    return resp.data[0].embedding
+CARD_MODEL = "gpt-4o-mini"
+# Bump when the llm_card prompt changes, so cached cards are regenerated.
+CARD_PROMPT_VERSION = 2
+# Budget for the doc's extractive summary in the card prompt (was content[:1500]).
+CARD_CONTENT_TOKENS = 500
+# Prompt template plus the JSON card we ask for, on top of the content.
+CARD_OVERHEAD_TOKENS = 600
 
+# --- Retry wrappers ---
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=2, max=15))
 def llm_card(doc):
-    content = doc["content"][:1500]
+    content = doc["summary"]
     msg = [
         {"role": "system", "content": "You are a market analyst. Output valid JSON only."},
         {"role": "user", "content": f"""
@@ -54,101 +85,273 @@ Generate:
   "tweet_draft": "Short, tweetable version"
 }}"""}
     ]
-    resp = client.chat.completions.create(model="gpt-4o-mini", messages=msg, temperature=0.2)
+    resp = client.chat.completions.create(model=CARD_MODEL, messages=msg, temperature=0.2)
     txt = resp.choices[0].message.content
     start, end = txt.find("{"), txt.rfind("}")
     return json.loads(txt[start:end+1])
 
 # --- Processing ---
-def process_doc(raw):
-    text = raw.get("content") or ""
-    if not text:
-        return None
-    # Entities
-    ents = [{"name": ent.text, "type": ent.label_} for ent in nlp(text[:4000]).ents if ent.label_ in ["PERSON","ORG","GPE"]]
-    ents = list({e["name"]: e for e in ents}.values())
-    # Embedding + urgency
-    vector = embed(text)
+def prefilter_docs(raws):
+    """Drop or down-rank docs off our watchlists (config/relevance.yaml)
+    before they cost NER, embedding or LLM time."""
+    return relevance.filter(raws)
+
+def dedup_docs(raws, seen):
+    """Fold near-duplicates (MinHash LSH, kept across runs) before any paid
+    work; every copy is recorded in the canonical signal's source_refs.
+    `seen` is this run's LSHIndex; see remember_docs."""
+    kept, refs = fold_duplicates(raws, lsh, seen)
+    if refs:
+        ops = [UpdateOne({"_id": i}, {"$addToSet": {"source_refs": {"$each": r}}}, upsert=True)
+               for i, r in refs.items()]
+        try:
+            signals.bulk_write(ops, ordered=False)
+        except PyMongoError as e:
+            logging.error(f"Recording source refs failed: {e}")
+    folded = sum(len(r) for r in refs.values()) - len(kept)
+    if folded:
+        logging.info(f"Dedup: folded {folded} near-duplicates into existing signals")
+    return kept
+
+def enrich_doc(raw):
+    """Entities, sentiment and urgency for a raw fetched doc (no network)."""
+    return enrich_docs([raw])[0] if raw.get("content") else None
+
+def enrich_docs(raws):
+    """enrich_doc over many docs, streaming all of them through one nlp.pipe."""
+    raws = [raw for raw in raws if raw.get("content")]
+    ents = extract_entities((raw["content"] for raw in raws), nlp, n_process=NER_PROCESSES)
+    return [_build_doc(raw, e) for raw, e in zip(raws, ents)]
+
+def _build_doc(raw, ents):
+    text = raw["content"]
     s = sentiment.polarity_scores(text)["compound"]
-    urgency = abs(s) * (2 if any(k in text.lower() for k in ["protest","dispute","revocation","crisis"]) else 1)
-    doc = {
+    hits = get_keywords().scan(text)  # country, topic and urgency in one pass
+    urgency = abs(s) * (2 if hits.any("urgency") else 1)
+    urgency *= raw.get("relevance_weight", 1.0)
+    return {
         "_id": raw["_id"],
         "type": raw["type"],
-        "country": raw.get("country","Unknown"),
-        "topic": raw.get("topic","regulatory"),
+        "country": raw.get("country") if raw.get("country") not in (None, "Unknown") else hits.best("country", "Unknown"),
+        "topic": raw.get("topic") or hits.best("topic", "regulatory"),
         "content": text,
         "metadata": raw.get("metadata",{}),
+        **({"chunks": raw["chunks"]} if raw.get("chunks") else {}),
         "entities": ents,
-        "embedding": vector,
+        "summary": summarize(text, CARD_CONTENT_TOKENS, entities=[e["name"] for e in ents]),
         "urgency": urgency,
+        "relevance": raw.get("relevance"),
         "timestamp": utc_now()
     }
-    signals.update_one({"_id": doc["_id"]}, {"$set": doc}, upsert=True)
+
+def embed_doc(doc):
+    return embed_docs([doc])[0]
+
+def embed_docs(docs):
+    """Embed every passage of many docs in as few API calls as the token
+    budget allows; each doc's embedding is the mean of its passages."""
+    for doc in docs:
+        doc["passages"] = passages_for(doc)
+    texts = [p["text"] for doc in docs for p in doc["passages"]]
+    vectors = iter(embedder.embed_many(texts))
+    for doc in docs:
+        for passage in doc["passages"]:
+            passage["embedding"] = next(vectors)
+        if doc["passages"]:
+            doc["embedding"] = mean_vector([p["embedding"] for p in doc["passages"]])
+    return docs
+
+def upsert_signal(doc, writer=None, passage_writer=None):
+    """Write the signal and, separately, its passages (kept out of the signal).
+    Embeddings are stored quantized (see vector_codec). Passages left over
+    from a longer earlier version of the doc are deleted."""
+    signal = {k: v for k, v in doc.items() if k not in ("passages", "chunks")}
+    if "embedding" in doc:
+        signal.update(encode(doc["embedding"]))
+    if writer:
+        writer.upsert(doc["_id"], signal)
+    else:
+        signals.update_one({"_id": doc["_id"]}, {"$set": signal}, upsert=True)
+    for passage in doc.get("passages", []):
+        passage = {**passage, **encode(passage["embedding"])}
+        if passage_writer:
+            passage_writer.upsert(passage["_id"], passage)
+        else:
+            passages.update_one({"_id": passage["_id"]}, {"$set": passage}, upsert=True)
+    if "passages" in doc:
+        try:
+            passages.delete_many({"doc_id": doc["_id"], "index": {"$gte": len(doc["passages"])}})
+        except PyMongoError as e:
+            logging.error(f"Deleting stale passages of {doc['_id']} failed: {e}")
     return doc
 
-def generate_card(doc):
+def process_doc(raw):
+    doc = enrich_doc(raw)
+    if not doc:
+        return None
+    return upsert_signal(embed_doc(doc))
+
+def card_key(doc):
+    return get_llm_cache().key(CARD_MODEL, CARD_PROMPT_VERSION,
+                               doc["_id"], doc["type"], doc["country"], doc["topic"], doc["summary"])
+
+def cached_card(doc):
+    """llm_card, reused while the doc's content and the prompt are unchanged.
+    Urgency and timestamp always come from the current run."""
+    card = get_llm_cache().call(card_key(doc), lambda: llm_card(doc))
+    card.update(urgency=doc["urgency"], timestamp=doc["timestamp"])
+    return card
+
+def generate_card(doc, writer=None):
     try:
-        card = llm_card(doc)
+        card = cached_card(doc)
         card["tags"] = list({doc["topic"], *[e["name"] for e in doc.get("entities",[]) if e["type"]=="ORG"][:3]})
-        cards.update_one({"_id": card["_id"]}, {"$set": card}, upsert=True)
+        if writer:
+            writer.upsert(card["_id"], card)
+        else:
+            cards.update_one({"_id": card["_id"]}, {"$set": card}, upsert=True)
         return card
     except Exception as e:
         logging.error(f"Card gen failed for {doc['_id']}: {e}")
         return None
 
+def submit_card(llm, doc, writer=None):
+    """Queue card generation on the LLM executor, most urgent first.
+    Cards already in the LLM cache are built right away without queueing."""
+    if get_llm_cache().cached(card_key(doc)) is not None:
+        future = Future()
+        future.set_result(generate_card(doc, writer))
+        return future
+    tokens = estimate_tokens(doc["summary"]) + CARD_OVERHEAD_TOKENS
+    return llm.submit(generate_card, doc, writer, priority=doc["urgency"], tokens=tokens)
+
+def remember_docs(seen, done, signal_writer, passage_writer, card_writer):
+    """Add docs whose signal, passages and card were all written to the
+    persistent LSH index, then save it. Anything that failed stays out, so
+    the next run processes it again instead of folding it away."""
+    failed = {doc_id for doc_id, _ in signal_writer.failed + card_writer.failed}
+    failed |= {str(passage_id).rsplit(":", 1)[0] for passage_id, _ in passage_writer.failed}
+    for doc_id, card in done:
+        if card and doc_id not in failed and card.get("_id") not in failed:
+            lsh.add(doc_id, seen.signatures[doc_id][0])
+    lsh.save()
+
 # --- Main ---
-def run_pipeline():
+# Workers per stage in staged mode; override with e.g. PRISM_WORKERS_EMBED=16.
+# dedup stays at 1: it checks and extends one shared LSH index. The card stage
+# only queues work; LLM concurrency is set by PRISM_LLM_CONCURRENCY.
+STAGE_WORKERS = {"fetch": 4, "prefilter": 2, "dedup": 1, "enrich": 1, "embed": 4, "upsert": 4, "card": 1}
+ENRICH_BATCH = 16
+EMBED_BATCH = 64
+
+def stage_workers(name):
+    return int(os.getenv(f"PRISM_WORKERS_{name.upper()}", STAGE_WORKERS[name]))
+
+def fetch_jobs():
+    """Zero-arg callables, each returning a list of raw docs."""
     from fetchers.youtube_fetcher import fetch_youtube_videos
     from fetchers.x_fetcher import fetch_x_posts
     from fetchers.pdf_fetcher import fetch_gov_pdfs
+    return [fetch_youtube_videos, fetch_x_posts, fetch_gov_pdfs]
 
-    raw_docs = []
-    raw_docs += fetch_youtube_videos()
-    raw_docs += fetch_x_posts()
-    raw_docs += fetch_gov_pdfs()
+def run_staged_pipeline(jobs=None):
+    """Fetch, enrich, embed, upsert and card generation as concurrent stages.
 
-    logging.info(f"Fetched {len(raw_docs)} docs")
+    Each stage has its own worker pool (see STAGE_WORKERS) and hands docs to
+    the next through a bounded queue, so network-bound stages overlap instead
+    of adding up.
+    """
+    from stages import Stage, run_stages
 
-    processed, generated = [], []
-    for raw in raw_docs:
-        doc = process_doc(raw)
-        if doc:
-            processed.append(doc)
-            card = generate_card(doc)
-            if card:
-                generated.append(card)
+    setup()
+    seen = LSHIndex()
+    with BulkUpserter(signals) as signal_writer, BulkUpserter(cards) as card_writer, \
+            BulkUpserter(passages) as passage_writer, LLMExecutor(name="cards") as llm:
+        pipeline = [
+            Stage("fetch", lambda job: job(), stage_workers("fetch"), fan_out=True),
+            Stage("prefilter", prefilter_docs, stage_workers("prefilter"), batch_size=ENRICH_BATCH),
+            Stage("dedup", lambda raws: dedup_docs(raws, seen), stage_workers("dedup"), batch_size=ENRICH_BATCH),
+            Stage("enrich", enrich_docs, stage_workers("enrich"), batch_size=ENRICH_BATCH),
+            Stage("embed", embed_docs, stage_workers("embed"), batch_size=EMBED_BATCH),
+            Stage("upsert", lambda doc: upsert_signal(doc, signal_writer, passage_writer), stage_workers("upsert")),
+            Stage("card", lambda doc: (doc["_id"], submit_card(llm, doc, card_writer)), stage_workers("card")),
+        ]
+        pending, counts = run_stages(jobs or fetch_jobs(), pipeline)
+        done = [(doc_id, f.result()) for doc_id, f in pending]
+    generated = [card for _, card in done if card]
+    remember_docs(seen, done, signal_writer, passage_writer, card_writer)
 
-    logging.info(f"Pipeline finished: {len(processed)} signals, {len(generated)} cards")
-    return {"signals": len(processed), "cards": len(generated)}
+    failed = len(signal_writer.failed) + len(card_writer.failed) + len(passage_writer.failed)
+    logging.info(f"Fetched {counts['fetch']} docs")
+    logging.info(f"Pipeline finished: {counts['upsert']} signals, {len(generated)} cards, {failed} failed writes")
+    return {"signals": counts["upsert"], "cards": len(generated), "failed_writes": failed}
 
-if __name__ == "__main__":
-    run_pipeline()
-🛠 MongoDB AI Search Setup
-After this reboot, you’ll need to define a Vector Search index in Atlas:
-
-Go to Atlas → Collections → rhis_prism → signals → Indexes → Create Index → Vector Search.
-
-Configure:
-
-Path: embedding
+def run_pipeline():
+    setup()
+    raw_docs = []
+    for job in fetch_jobs():
+        raw_docs += job()
 
-Type: vector
+    logging.info(f"Fetched {len(raw_docs)} docs")
 
-Dimensions: 1536 (for text-embedding-3-small)
+    seen = LSHIndex()
+    processed = embed_docs(enrich_docs(dedup_docs(prefilter_docs(raw_docs), seen)))
+    with BulkUpserter(signals) as signal_writer, BulkUpserter(cards) as card_writer, \
+            BulkUpserter(passages) as passage_writer, LLMExecutor(name="cards") as llm:
+        for doc in processed:
+            upsert_signal(doc, signal_writer, passage_writer)
+        pending = [(doc["_id"], submit_card(llm, doc, card_writer)) for doc in processed]
+        done = [(doc_id, f.result()) for doc_id, f in pending]
 
-Metric: cosine
+    generated = [card for _, card in done if card]
+    remember_docs(seen, done, signal_writer, passage_writer, card_writer)
+    failed = len(signal_writer.failed) + len(card_writer.failed) + len(passage_writer.failed)
+    logging.info(f"Pipeline finished: {len(processed)} signals, {len(generated)} cards, {failed} failed writes")
+    return {"signals": len(processed), "cards": len(generated), "failed_writes": failed}
 
-This unlocks queries like:
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="PRISM daily pipeline")
+    parser.add_argument("--staged", action="store_true", help="run stages concurrently (see STAGE_WORKERS)")
+    args = parser.parse_args()
+    if args.staged:
+        run_staged_pipeline()
+    else:
+        run_pipeline()
 
-python
-Copy code
-db.signals.aggregate([
-  {
-    "$vectorSearch": {
-      "queryVector": <your_embedding>,
-      "path": "embedding",
-      "numCandidates": 200,
-      "limit": 10
-    }
-  }
-])
+# 🛠 MongoDB AI Search Setup
+# After this reboot, you’ll need to define a Vector Search index in Atlas:
+#
+# Go to Atlas → Collections → rhis_prism → signals → Indexes → Create Index → Vector Search.
+#
+# Configure:
+#
+# Path: embedding
+#
+# Type: vector
+#
+# Dimensions: 1536 (for text-embedding-3-small)
+#
+# Metric: cosine
+#
+# `embedding` is stored as an int8 BSON vector (vector_codec), which Atlas
+# indexes as-is; query with vector_codec.query_vector and rescore the
+# candidates with the float32 query (see query_mongo.search_atlas).
+#
+# Create the same index (named rhis_passages) on rhis_prism → passages, with
+# country/type/doc_id as filter fields, for passage-level search.
+#
+# This unlocks queries like:
+#
+# python
+# Copy code
+# db.signals.aggregate([
+#   {
+#     "$vectorSearch": {
+#       "queryVector": <your_embedding>,
+#       "path": "embedding",
+#       "numCandidates": 200,
+#       "limit": 10
+#     }
+#   }
+# ])
@@ -1,7 +1,14 @@
 import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pymongo import MongoClient
 from openai import OpenAI
 from dotenv import load_dotenv
+from embeddings import EmbeddingService
+from vector_codec import RESCORE_FACTOR, query_vector as int8_query, rescore
 
 # Load env
 load_dotenv(dotenv_path=".env")
@@ -10,40 +17,186 @@ load_dotenv(dotenv_path=".env")
 client = MongoClient(os.getenv("MONGO_URI"))
 db = client["rhis_prism"]
 collection = db["regulatory_objects"]
+passages = db["passages"]
+PASSAGE_FIELDS = {"doc_id": 1, "country": 1, "text": 1, "start": 1, "end": 1,
+                  "timestamp": 1, "end_timestamp": 1, "speakers": 1, "section": 1, "page": 1}
+VECTOR_FIELDS = {"embedding": 1, "embedding_scale": 1, "embedding_f32": 1}
 
 # OpenAI
 openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+embedder = EmbeddingService(openai_client, model="text-embedding-3-small")
+
+QUERY_CACHE_SIZE = int(os.getenv("PRISM_QUERY_CACHE_SIZE", 1024))
+QUERY_CACHE_TTL = float(os.getenv("PRISM_QUERY_CACHE_TTL", 3600))
+SEARCH_WORKERS = 8
+
+class QueryVectorCache:
+    """In-memory LRU of recent query vectors; entries expire after `ttl` seconds."""
+
+    def __init__(self, max_size=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL):
+        self.max_size, self.ttl = max_size, ttl
+        self._entries = OrderedDict()  # query -> (expires_at, vector)
+        self._lock = threading.Lock()
+
+    def get(self, query):
+        with self._lock:
+            entry = self._entries.get(query)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[query]
+                return None
+            self._entries.move_to_end(query)
+            return entry[1]
+
+    def put(self, query, vector):
+        with self._lock:
+            self._entries[query] = (time.monotonic() + self.ttl, vector)
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+query_vectors = QueryVectorCache()
+
+def _query_key(text):
+    return " ".join(text.split())
+
+def embed_queries(queries):
+    """Vectors for many queries; the ones not cached are embedded in one call."""
+    keys = [_query_key(q) for q in queries]
+    vectors = {k: query_vectors.get(k) for k in set(keys)}
+    missing = [k for k, v in vectors.items() if v is None]
+    if missing:
+        for k, vector in zip(missing, embedder.embed_many(missing)):
+            query_vectors.put(k, vector)
+            vectors[k] = vector
+    return [vectors[k] for k in keys]
 
 def get_embedding(text: str):
-    return openai_client.embeddings.create(
-        model="text-embedding-3-small",
-        input=text
-    ).data[0].embedding
-
-# 👇 Example query
-query_text = "indigenous consultation in Jujuy lithium mining"
-query_vector = get_embedding(query_text)
-
-pipeline = [
-    {
-        "$vectorSearch": {
-            "queryVector": query_vector,
-            "path": "embedding",
-            "numCandidates": 100,
-            "limit": 5,
-            "index": "rhis_prism"  # matches your index name in Atlas
-        }
-    },
-    {
-        "$project": {
-            "country": 1,
-            "content": 1,
-            "score": {"$meta": "vectorSearchScore"}
-        }
+    return embed_queries([text])[0]
+
+def search_atlas(query_vector, k=5, country=None, type=None):
+    """Atlas $vectorSearch over the int8 regulatory_objects.embedding, then a
+    float32-query rescore of the candidates; content is fetched for the top-k
+    only. country/type need to be filter fields of the rhis_prism index."""
+    limit = k * RESCORE_FACTOR
+    search = {
+        "queryVector": int8_query(query_vector),
+        "path": "embedding",
+        "numCandidates": max(100, limit),
+        "limit": limit,
+        "index": "rhis_prism"  # matches your index name in Atlas
     }
-]
+    filters = {f: v for f, v in (("country", country), ("type", type)) if v is not None}
+    if filters:
+        search["filter"] = filters
+    pipeline = [
+        {"$vectorSearch": search},
+        {"$project": VECTOR_FIELDS}
+    ]
+    candidates = list(collection.aggregate(pipeline))
+    return _fetch([(str(d["_id"]), score) for d, score in rescore(query_vector, candidates, k)])
+
+_local_indexes = {}
+
+def _fetch(hits):
+    """Docs for [(id, score)] hits from a local index, in hit order."""
+    from bson import ObjectId
+    keys = [ObjectId(i) if ObjectId.is_valid(i) else i for i, _ in hits]
+    docs = {str(d["_id"]): d for d in collection.find({"_id": {"$in": keys}}, {"country": 1, "content": 1})}
+    return [{**docs[i], "score": score} for i, score in hits if i in docs]
+
+def search_local(query_vector, k=5, country=None, type=None, index_path=None):
+    """Same results from the on-disk VectorIndex (python vector_index.py regulatory_objects);
+    no Atlas search index needed, only the documents themselves are fetched."""
+    from vector_index import INDEX_DIR, VectorIndex
+
+    index_path = index_path or os.path.join(INDEX_DIR, collection.name)
+    if index_path not in _local_indexes:
+        _local_indexes[index_path] = VectorIndex.load(index_path)
+    return _fetch(_local_indexes[index_path].search(query_vector, k, country=country, type=type))
+
+def search_passages(query_vector, k=5, country=None, type=None, local=False):
+    """Best-matching passages (signals split by prism_daily_pipeline) with the
+    offsets and, for transcripts, the timestamp to jump to."""
+    if local:  # python vector_index.py passages
+        from vector_index import INDEX_DIR, VectorIndex
+        path = os.path.join(INDEX_DIR, passages.name)
+        if path not in _local_indexes:
+            _local_indexes[path] = VectorIndex.load(path)
+        hits = _local_indexes[path].search(query_vector, k, country=country, type=type)
+        found = {d["_id"]: d for d in passages.find({"_id": {"$in": [i for i, _ in hits]}}, PASSAGE_FIELDS)}
+        return [{**found[i], "score": score} for i, score in hits if i in found]
+
+    search = {"queryVector": int8_query(query_vector), "path": "embedding",
+              "numCandidates": max(100, k * RESCORE_FACTOR), "limit": k * RESCORE_FACTOR, "index": "rhis_passages"}
+    filters = {f: v for f, v in (("country", country), ("type", type)) if v is not None}
+    if filters:
+        search["filter"] = filters
+    pipeline = [
+        {"$vectorSearch": search},
+        {"$project": {**PASSAGE_FIELDS, **VECTOR_FIELDS}},
+    ]
+    hits = rescore(query_vector, list(passages.aggregate(pipeline)), k)
+    return [{**{f: v for f, v in d.items() if f not in VECTOR_FIELDS}, "score": score} for d, score in hits]
+
+def search_hybrid(query_text, k=5, country=None, type=None):
+    """BM25 (exact names like "SEMARNAT") fused with local vector search via RRF."""
+    import hybrid_search
+    from bm25 import BM25Index, index_path
+    from vector_index import INDEX_DIR, VectorIndex
+
+    key = ("hybrid", collection.name)
+    if key not in _local_indexes:
+        _local_indexes[key] = (BM25Index.load(index_path(collection.name)),
+                               VectorIndex.load(os.path.join(INDEX_DIR, collection.name)))
+    keywords, vectors = _local_indexes[key]
+    hits, timings = hybrid_search.search(query_text, keywords, vectors, get_embedding, k,
+                                         country=country, type=type)
+    logging.debug("hybrid search " + ", ".join(f"{s}={t * 1000:.1f}ms" for s, t in timings.items() if t is not None))
+    return _fetch([(h["id"], h["score"]) for h in hits])
+
+_search_pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search")
+
+def search_many(queries, k=5, mode="atlas", country=None, type=None, local=False):
+    """Run several queries at once: embed them in one batch (minus cached
+    ones), then run their searches concurrently. Results are in query order.
+    mode is "atlas", "local", "hybrid" or "passages" (local=True for the
+    on-disk passage index)."""
+    vectors = embed_queries(queries)
+    if mode == "hybrid":  # embeds via get_embedding, now a cache hit
+        jobs = [(search_hybrid, (q, k, country, type)) for q in queries]
+    elif mode == "local":
+        jobs = [(search_local, (v, k, country, type)) for v in vectors]
+    elif mode == "passages":
+        jobs = [(search_passages, (v, k, country, type, local)) for v in vectors]
+    else:
+        jobs = [(search_atlas, (v, k, country, type)) for v in vectors]
+    futures = [_search_pool.submit(fn, *args) for fn, args in jobs]
+    return [f.result() for f in futures]
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Semantic search over regulatory_objects")
+    parser.add_argument("query", nargs="*", default=["indigenous consultation in Jujuy lithium mining"])  # 👇 Example query
+    parser.add_argument("--local", action="store_true", help="search the local vector index instead of Atlas")
+    parser.add_argument("--hybrid", action="store_true", help="fuse local keyword (BM25) and vector results")
+    parser.add_argument("--passages", action="store_true", help="return matching passages of signals, with timestamps")
+    parser.add_argument("--country")
+    parser.add_argument("--type")
+    args = parser.parse_args()
+
+    if args.passages:
+        batches = search_many(args.query, mode="passages", country=args.country, type=args.type, local=args.local)
+        for query, results in zip(args.query, batches):
+            print(f"\n🔎 Passages for: {query}\n")
+            for r in results:
+                where = f"@{r['timestamp']}s" if r.get("timestamp") else r.get("section") or f"chars {r['start']}-{r['end']}"
+                print(f"[{r.get('country','?')}] {r['doc_id']} {where}: {r['text'][:160]}... (score={r['score']:.4f})")
+        raise SystemExit
 
-results = list(collection.aggregate(pipeline))
-print(f"\n🔎 Results for: {query_text}\n")
-for r in results:
-    print(f"[{r.get('country','?')}] {r['content'][:120]}... (score={r['score']:.4f})")
+    mode = "hybrid" if args.hybrid else "local" if args.local else "atlas"
+    for query, results in zip(args.query, search_many(args.query, mode=mode, country=args.country, type=args.type)):
+        print(f"\n🔎 Results for: {query}\n")
+        for r in results:
+            print(f"[{r.get('country','?')}] {r['content'][:120]}... (score={r['score']:.4f})")
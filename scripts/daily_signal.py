@@ -1,13 +1,14 @@
 import os
-import requests
 import json
 import re
 import yaml
 from dotenv import load_dotenv
-import weaviate
+from fetchers.http_session import get_session
+from weaviate_writer import SignalWriter, connect
+from llm_executor import LLMExecutor
 
 # Import our transcript + analysis helpers
-from scripts.transcribe_and_analyze import fetch_transcript, analyze_with_grok
+from scripts.transcribe_and_analyze import fetch_transcript, analyze_with_grok, GROK_TRANSCRIPT_TOKENS
 
 # Load environment variables
 load_dotenv()
@@ -20,25 +21,8 @@ if not XAI_KEY or not YT_KEY or not YOUTUBE_DATA_API_KEY:
     print("❌ Missing API keys in .env (XAI_API_KEY, YOUTUBE_TRANSCRIPT_API_KEY, YOUTUBE_DATA_API_KEY)")
     exit(1)
 
-# Initialize Weaviate client (v3 syntax)
-client = weaviate.Client("http://localhost:8080")
-
-# Ensure schema exists
-try:
-    client.schema.get("RegulatorySignal")
-    print("ℹ️ Schema class 'RegulatorySignal' already exists")
-except:
-    print("⚠️ Creating missing schema class 'RegulatorySignal'")
-    client.schema.create_class({
-        "class": "RegulatorySignal",
-        "properties": [
-            {"name": "key_issues", "dataType": ["string"]},
-            {"name": "market_sector_impact", "dataType": ["string"]},
-            {"name": "who_bleeds", "dataType": ["string[]"]},
-            {"name": "who_benefits", "dataType": ["string[]"]},
-            {"name": "legal_compliance_implications", "dataType": ["string"]}
-        ]
-    })
+# Initialize Weaviate client (v4, gRPC batching; schema ensured by SignalWriter)
+client = connect()
 
 # --- Utility functions ---
 
@@ -47,46 +31,63 @@ def extract_video_id(text: str) -> str:
     match = re.search(r"youtube\.com/watch\?v=([\w-]+)", text)
     return match.group(1) if match else None
 
-def safe_insert(obj: dict, source: str):
-    """Insert object into Weaviate with debug logging."""
+def safe_insert(writer: SignalWriter, obj: dict, source: str, video_id: str):
+    """Queue object for a batched Weaviate upsert keyed by video_id."""
     try:
-        print(f"📝 Preparing object from {source}: {json.dumps(obj, indent=2)}")
-        client.data_object.create(obj, class_name="RegulatorySignal")
-        print("✅ Inserted into Weaviate")
+        writer.add(obj, video_id)
+        print(f"📝 Queued object from {source}")
     except Exception as e:
         print(f"❌ Insert error for {source}: {e}")
 
+# Grok prompt template and JSON answer, on top of the transcript excerpt
+GROK_OVERHEAD_TOKENS = 600
+
+def analyze_video(video_id: str) -> dict:
+    """Transcript + Grok analysis for one video; runs on the LLM executor."""
+    analysis = analyze_with_grok(fetch_transcript(video_id))
+    return analysis if isinstance(analysis, dict) else json.loads(analysis)
+
+def submit_analysis(llm: LLMExecutor, video_id: str):
+    return llm.submit(analyze_video, video_id, tokens=GROK_TRANSCRIPT_TOKENS + GROK_OVERHEAD_TOKENS)
+
+def insert_analyses(writer: SignalWriter, pending):
+    """Wait for queued analyses [(source, video_id, future)] and queue each result."""
+    for source, video_id, future in pending:
+        try:
+            safe_insert(writer, future.result(), source, video_id)
+        except Exception as e:
+            print(f"❌ Analysis Error for {video_id}: {e}")
+
 # --- Scanners ---
 
-def scan_semantic_alerts():
+def scan_semantic_alerts(writer: SignalWriter, llm: LLMExecutor):
     """Example: semantic search on X/Twitter (stub endpoint)."""
     query = "rare earth minerals policy change China 2025"
     headers = {"Authorization": f"Bearer {XAI_KEY}"}
     url = "https://api.x.ai/v1/semantic-search"  # placeholder
 
     try:
-        resp = requests.post(url, headers=headers, json={"query": query, "limit": 5}, timeout=30)
+        resp = get_session().post(url, headers=headers, json={"query": query, "limit": 5}, timeout=30)
         if resp.status_code != 200:
             print(f"❌ Semantic Search Failed: {resp.status_code} {resp.text}")
             return
 
         results = resp.json().get("results", [])
+        pending = []
         for post in results:
             video_id = extract_video_id(post.get("text", ""))
             if video_id:
                 print(f"🎯 Found video ID: {video_id}")
-                try:
-                    transcript = fetch_transcript(video_id)
-                    analysis = analyze_with_grok(transcript)
-                    safe_insert(json.loads(analysis), f"semantic:{video_id}")
-                except Exception as e:
-                    print(f"❌ Analysis Error for {video_id}: {e}")
+                pending.append((f"semantic:{video_id}", video_id, submit_analysis(llm, video_id)))
+        insert_analyses(writer, pending)
 
     except Exception as e:
         print(f"❌ Semantic Search Error: {e}")
 
-def scan_youtube_from_yaml():
-    """Scan YouTube channels defined in config/sources.yaml."""
+def scan_youtube_from_yaml(writer: SignalWriter, llm: LLMExecutor):
+    """Scan YouTube channels defined in config/sources.yaml. Each channel's
+    analysis is queued on the LLM executor while the next one is looked up."""
+    pending = []
     try:
         with open("config/sources.yaml", "r") as f:
             sources = yaml.safe_load(f)
@@ -98,31 +99,29 @@ def scan_youtube_from_yaml():
                     f"https://www.googleapis.com/youtube/v3/search?"
                     f"channelId={channel_id}&key={YOUTUBE_DATA_API_KEY}&order=date&maxResults=1&type=video"
                 )
-                resp = requests.get(yt_data_url)
+                resp = get_session().get(yt_data_url)
                 if resp.status_code == 200:
                     video_id = resp.json().get("items", [{}])[0].get("id", {}).get("videoId")
                     if video_id:
                         print(f"🎥 Fetching transcript from {source['label']} → {video_id}")
-                        try:
-                            transcript = fetch_transcript(video_id)
-                            analysis = analyze_with_grok(transcript)
-                            safe_insert(json.loads(analysis), f"youtube:{video_id}")
-                        except Exception as e:
-                            print(f"❌ Analysis Error for {video_id}: {e}")
+                        pending.append((f"youtube:{video_id}", video_id, submit_analysis(llm, video_id)))
                 else:
                     print(f"❌ YouTube API Error for {source['label']}: {resp.status_code} {resp.text}")
 
     except Exception as e:
         print(f"❌ YouTube Scan Error: {e}")
+    insert_analyses(writer, pending)
 
 # --- Entrypoint ---
 
 if __name__ == "__main__":
     print("🚀 Starting RhisSignals Daily Pipeline...")
     try:
-        scan_semantic_alerts()
-        scan_youtube_from_yaml()
+        with SignalWriter(client) as writer, LLMExecutor(name="grok") as llm:
+            scan_semantic_alerts(writer, llm)
+            scan_youtube_from_yaml(writer, llm)
     finally:
-        print("🛑 Finished run (no .close() needed for v3 client)")
+        client.close()
+        print("🛑 Finished run")
     print("✅ Pipeline completed. Check logs for alerts.")
 
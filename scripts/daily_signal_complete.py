@@ -1,30 +1,8 @@
-import weaviate
 from youtube_transcript_api import YouTubeTranscriptApi
+from weaviate_writer import SignalWriter, connect
 
-# --- Connect to Weaviate ---
-client = weaviate.Client("http://localhost:8080")
-
-# --- Schema setup ---
-def ensure_schema():
-    class_name = "RegulatorySignal"
-    existing_classes = [c["class"] for c in client.schema.get()["classes"]]
-
-    if class_name not in existing_classes:
-        client.schema.create_class({
-            "class": class_name,
-            "properties": [
-                {"name": "title", "dataType": ["text"]},
-                {"name": "video_id", "dataType": ["text"]},
-                {"name": "key_issues", "dataType": ["text"]},
-                {"name": "market_sector_impact", "dataType": ["text"]},
-                {"name": "who_bleeds", "dataType": ["text[]"]},
-                {"name": "who_benefits", "dataType": ["text[]"]},
-                {"name": "legal_compliance_implications", "dataType": ["text"]},
-            ]
-        })
-        print(f"✅ Created schema class {class_name}")
-    else:
-        print(f"ℹ️ Schema class '{class_name}' already exists")
+# --- Connect to Weaviate (schema ensured by SignalWriter) ---
+client = connect()
 
 # --- Transcript fetch (UPDATED FOR v1.2.2) ---
 def fetch_transcript(video_id: str, languages=["en", "es"]) -> str:
@@ -47,25 +25,23 @@ def fetch_transcript(video_id: str, languages=["en", "es"]) -> str:
         return f"No transcript available: {e}"
 
 # --- Insert into Weaviate ---
-def insert_signal(title, video_id, transcript):
-    client.data_object.create(
+def insert_signal(writer, title, video_id, transcript):
+    writer.add(
         {
             "title": title,
-            "video_id": video_id,
             "key_issues": transcript if transcript else "No transcript available",
             "market_sector_impact": "Unknown",
             "who_bleeds": [],
             "who_benefits": [],
             "legal_compliance_implications": "Unknown"
         },
-        "RegulatorySignal"
+        video_id
     )
-    print(f"✅ Inserted object for {title}")
+    print(f"📝 Queued object for {title}")
 
 # --- Main pipeline ---
 def run_pipeline():
     print("🚀 Running RhisSignals Daily Pipeline (no YouTube API)...")
-    ensure_schema()
 
     videos = [
         {"title": "Mexico Senate – Debate on Energy Reform", "id": "G6C2sSYV9fU"},
@@ -80,11 +56,15 @@ def run_pipeline():
         {"title": "British Columbia Legislature – Climate Change Debate", "id": "vlU6yRrG9iw"},
     ]
 
-    for video in videos:
-        vid, title = video["id"], video["title"]
-        print(f"🎥 Processing {title} ({vid})")
-        transcript = fetch_transcript(vid, languages=["en", "es"])
-        insert_signal(title, vid, transcript)
+    try:
+        with SignalWriter(client) as writer:
+            for video in videos:
+                vid, title = video["id"], video["title"]
+                print(f"🎥 Processing {title} ({vid})")
+                transcript = fetch_transcript(vid, languages=["en", "es"])
+                insert_signal(writer, title, vid, transcript)
+    finally:
+        client.close()
 
     print("✅ Finished run")
 
@@ -1,7 +1,7 @@
-import requests
 import yaml
 import os
 from dotenv import load_dotenv
+from fetchers.http_session import get_session
 
 load_dotenv()
 YT_KEY = os.getenv("YOUTUBE_DATA_API_KEY")
@@ -9,7 +9,7 @@ YT_KEY = os.getenv("YOUTUBE_DATA_API_KEY")
 def find_channel(label):
     query = label + " site:youtube.com"
     url = f"https://www.googleapis.com/youtube/v3/search?part=snippet&q={query}&type=channel&key={YT_KEY}&maxResults=1"
-    r = requests.get(url)
+    r = get_session().get(url)
     if r.status_code != 200:
         return None
     items = r.json().get("items", [])
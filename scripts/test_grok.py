@@ -1,12 +1,13 @@
-import os, requests
+import os
 from dotenv import load_dotenv
+from fetchers.http_session import get_session
 
 # Load keys from .env
 load_dotenv()
 api_key = os.getenv("XAI_API_KEY")
 
 # Call Grok API
-resp = requests.post(
+resp = get_session().post(
     "https://api.x.ai/v1/chat/completions",
     headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
     json={
@@ -3,6 +3,9 @@ import os
 import sys
 import requests
 from dotenv import load_dotenv
+from fetchers.http_session import get_session
+from llm_cache import get_llm_cache
+from summarize import summarize
 
 # --- Load environment variables ---
 load_dotenv()
@@ -22,7 +25,7 @@ def fetch_transcript(video_id: str) -> str:
         "Authorization": f"Basic {YT_KEY}",
         "Content-Type": "application/json",
     }
-    resp = requests.post(url, headers=headers, json={"ids": [video_id]}, timeout=60)
+    resp = get_session().post(url, headers=headers, json={"ids": [video_id]}, timeout=60)
 
     if resp.status_code != 200:
         raise Exception(f"Transcript fetch failed: {resp.status_code} {resp.text}")
@@ -52,47 +55,58 @@ def fetch_transcript(video_id: str) -> str:
     raise Exception("Transcript JSON missing both 'segments' and 'description'")
 
 # --- Analyze transcript with Grok ---
+# Bump when the Grok prompt changes
+GROK_PROMPT_VERSION = 2
+# Tokens of extractive summary sent in place of the transcript's first 1000 chars
+GROK_TRANSCRIPT_TOKENS = 350
+
 def analyze_with_grok(text: str) -> dict:
     print("\n🤖 Sending transcript to Grok...")
     headers = {"Authorization": f"Bearer {XAI_KEY}", "Content-Type": "application/json"}
+    excerpt = summarize(text, GROK_TRANSCRIPT_TOKENS)
     prompt = f"""
     Analyze this legislative transcript and summarize:
     - Key issues
     - Market/sector impact
     - Who bleeds? Who benefits?
     - Legal/compliance implications
-    Transcript (first 1000 chars): {text[:1000]}
+    Transcript (key passages): {excerpt}
     Return JSON with keys:
     key_issues, market_sector_impact, who_bleeds, who_benefits, legal_compliance_implications
     """
 
-    resp = requests.post(
-        "https://api.x.ai/v1/chat/completions",
-        headers=headers,
-        json={
-            "model": "grok-3",  # ✅ upgraded from grok-beta
-            "messages": [{"role": "user", "content": prompt}],
-        },
-        timeout=60,
-    )
+    def ask():
+        resp = get_session().post(
+            "https://api.x.ai/v1/chat/completions",
+            headers=headers,
+            json={
+                "model": "grok-3",  # ✅ upgraded from grok-beta
+                "messages": [{"role": "user", "content": prompt}],
+            },
+            timeout=60,
+        )
 
-    print("DEBUG: XAI Key Prefix:", XAI_KEY[:10] + "...")
-    print("DEBUG: Grok Response Status:", resp.status_code)
+        print("DEBUG: XAI Key Prefix:", XAI_KEY[:10] + "...")
+        print("DEBUG: Grok Response Status:", resp.status_code)
 
-    if resp.status_code != 200:
-        raise Exception(f"Grok API failed: {resp.status_code} {resp.text}")
+        if resp.status_code != 200:
+            raise Exception(f"Grok API failed: {resp.status_code} {resp.text}")
 
-    try:
-        content = resp.json()["choices"][0]["message"]["content"]
-        analysis = requests.utils.json.loads(content)
-        return analysis
-    except Exception as e:
-        raise Exception(f"Failed to parse Grok response: {e}\nRaw: {resp.text}")
+        try:
+            content = resp.json()["choices"][0]["message"]["content"]
+            analysis = requests.utils.json.loads(content)
+            return analysis
+        except Exception as e:
+            raise Exception(f"Failed to parse Grok response: {e}\nRaw: {resp.text}")
+
+    # Reprocessing the same transcript reuses the stored analysis
+    key = get_llm_cache().key("grok-3", GROK_PROMPT_VERSION, excerpt)
+    return get_llm_cache().call(key, ask)
 
 # --- CLI entrypoint ---
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python scripts/transcribe_and_analyze.py <YouTubeVideoID>")
+        print("Usage: python -m scripts.transcribe_and_analyze <YouTubeVideoID>")
         sys.exit(1)
 
     video_id = sys.argv[1]
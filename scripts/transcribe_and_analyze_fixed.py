@@ -1,8 +1,10 @@
 import os
-import requests
 import sys
 import json
 from dotenv import load_dotenv
+from fetchers.http_session import get_session
+from llm_cache import get_llm_cache
+from summarize import summarize
 
 load_dotenv()
 
@@ -21,7 +23,7 @@ def fetch_transcript(video_id: str) -> str:
         "Authorization": f"Basic {YT_KEY}",
         "Content-Type": "application/json"
     }
-    resp = requests.post(url, headers=headers, json={"ids": [video_id]}, timeout=60)
+    resp = get_session().post(url, headers=headers, json={"ids": [video_id]}, timeout=60)
 
     if resp.status_code != 200:
         raise Exception(f"Transcript fetch failed: {resp.status_code} {resp.text}")
@@ -57,46 +59,57 @@ def fetch_transcript(video_id: str) -> str:
     raise Exception(f"No transcript segments or description available for video {video_id}. Try YouTube Data API or Whisper for audio.")
 
 
+# Bump when the Grok prompt changes
+GROK_PROMPT_VERSION = 2
+# Tokens of extractive summary sent in place of the transcript's first 1000 chars
+GROK_TRANSCRIPT_TOKENS = 350
+
 def analyze_with_grok(text: str) -> str:
+    excerpt = summarize(text, GROK_TRANSCRIPT_TOKENS)
     prompt = f"""
     Analyze this legislative transcript and summarize in structured format:
     - Key issue(s) discussed
     - Market/sector impact
     - Who bleeds? Who benefits?
     - Legal/compliance implications
-    Transcript (first 1000 chars shown): {text[:1000]}
+    Transcript (key passages): {excerpt}
     Output as JSON for easy parsing. End with disclaimer: "Informational only—not legal advice."
     """
-    resp = requests.post(
-        "https://api.x.ai/v1/chat/completions",
-        headers={"Authorization": f"Bearer {XAI_KEY}", "Content-Type": "application/json"},
-        json={
-            "model": "grok-beta",  # Fixed: Use stable model (grok-beta for Grok-2; change to grok-4 for SuperGrok)
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.3  # Low for factual output
-        },
-        timeout=60
-    )
+    def ask():
+        resp = get_session().post(
+            "https://api.x.ai/v1/chat/completions",
+            headers={"Authorization": f"Bearer {XAI_KEY}", "Content-Type": "application/json"},
+            json={
+                "model": "grok-beta",  # Fixed: Use stable model (grok-beta for Grok-2; change to grok-4 for SuperGrok)
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 0.3  # Low for factual output
+            },
+            timeout=60
+        )
     
-    print(f"DEBUG: Grok Response Status: {resp.status_code}")  # Audit log
-    if resp.status_code != 200:
-        raise Exception(f"Grok API failed: {resp.status_code} {resp.text}")
+        print(f"DEBUG: Grok Response Status: {resp.status_code}")  # Audit log
+        if resp.status_code != 200:
+            raise Exception(f"Grok API failed: {resp.status_code} {resp.text}")
     
-    try:
-        response_json = resp.json()
-        print(f"DEBUG: Grok Response Keys: {list(response_json.keys())}")  # Check for 'choices'
+        try:
+            response_json = resp.json()
+            print(f"DEBUG: Grok Response Keys: {list(response_json.keys())}")  # Check for 'choices'
         
-        if "choices" not in response_json:
-            raise Exception(f"No 'choices' in response: {json.dumps(response_json, indent=2)}")  # Full error details
+            if "choices" not in response_json:
+                raise Exception(f"No 'choices' in response: {json.dumps(response_json, indent=2)}")  # Full error details
         
-        return response_json["choices"][0]["message"]["content"]
-    except (KeyError, IndexError, ValueError) as e:
-        raise Exception(f"JSON parse error in Grok response: {e}. Full response: {json.dumps(response_json if 'response_json' in locals() else resp.text, indent=2)}")
+            return response_json["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, ValueError) as e:
+            raise Exception(f"JSON parse error in Grok response: {e}. Full response: {json.dumps(response_json if 'response_json' in locals() else resp.text, indent=2)}")
+
+    # Reprocessing the same transcript reuses the stored analysis
+    key = get_llm_cache().key("grok-beta", GROK_PROMPT_VERSION, excerpt)
+    return get_llm_cache().call(key, ask)
 
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python scripts/transcribe_and_analyze.py <YouTubeVideoID>")
+        print("Usage: python -m scripts.transcribe_and_analyze_fixed <YouTubeVideoID>")
         sys.exit(1)
 
     video_id = sys.argv[1]
@@ -0,0 +1,107 @@
+import logging
+import queue
+import threading
+
+# Marks the end of a stage's input; one is queued per downstream worker.
+_DONE = object()
+
+
+class Stage:
+    """One step of a staged pipeline: `fn` runs on `workers` threads.
+
+    `fn` takes one item and returns the item to pass downstream, or None to
+    drop it. With `fan_out=True` it returns an iterable of items instead
+    (e.g. a fetch job returning many docs). With `batch_size` > 1 it is
+    called with a list of up to that many queued items and returns a list.
+    """
+
+    def __init__(self, name, fn, workers=1, fan_out=False, batch_size=1):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, int(workers))
+        self.fan_out = fan_out or batch_size > 1
+        self.batch_size = max(1, int(batch_size))
+
+
+def run_stages(items, stages, queue_size=100):
+    """Push `items` through `stages`, each stage on its own worker pool.
+
+    Stages are connected by bounded queues so a fast producer blocks instead
+    of buffering the whole run in memory. Returns (outputs of the last stage,
+    {stage name: items emitted}).
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    counts = {s.name: 0 for s in stages}
+    lock = threading.Lock()
+    remaining = [s.workers for s in stages]
+    results = []
+
+    def emit(i, out):
+        with lock:
+            counts[stages[i].name] += 1
+        queues[i + 1].put(out)
+
+    def take(stage, inq):
+        """Next input for `stage`: one item, or a list of up to batch_size
+        items that were already waiting. Returns (input, saw_done)."""
+        item = inq.get()
+        if stage.batch_size == 1 or item is _DONE:
+            return item, item is _DONE
+        batch = [item]
+        while len(batch) < stage.batch_size:
+            try:
+                item = inq.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def worker(i):
+        stage, inq = stages[i], queues[i]
+        while True:
+            item, done = take(stage, inq)
+            if item is _DONE:
+                break
+            try:
+                out = stage.fn(item)
+            except Exception as e:
+                logging.error(f"[{stage.name}] failed: {e}")
+                out = None
+            if out is not None:
+                for o in (out if stage.fan_out else [out]):
+                    if o is not None:
+                        emit(i, o)
+            if done:
+                break
+        with lock:
+            remaining[i] -= 1
+            last = remaining[i] == 0
+        if last:
+            downstream = stages[i + 1].workers if i + 1 < len(stages) else 1
+            for _ in range(downstream):
+                queues[i + 1].put(_DONE)
+
+    def collect():
+        while True:
+            item = queues[-1].get()
+            if item is _DONE:
+                break
+            results.append(item)
+
+    threads = [threading.Thread(target=collect, name="collect", daemon=True)]
+    for i, stage in enumerate(stages):
+        threads += [threading.Thread(target=worker, args=(i,), name=f"{stage.name}-{n}", daemon=True)
+                    for n in range(stage.workers)]
+    for t in threads:
+        t.start()
+
+    for item in items:
+        queues[0].put(item)
+    for _ in range(stages[0].workers):
+        queues[0].put(_DONE)
+
+    for t in threads:
+        t.join()
+    return results, counts
@@ -0,0 +1,87 @@
+import re
+
+import numpy as np
+
+from bm25 import tokenize
+from embeddings import estimate_tokens
+from hashing_vectorizer import vectorize_many
+from keywords import get_keywords
+
+KEYWORD_BOOST = 0.5  # per distinct `urgency` term (config/keywords.yaml) in a sentence
+ENTITY_BOOST = 2.0  # times the share of a sentence's words that are entity names
+MAX_UNITS = 300  # TextRank is quadratic; longer texts are grouped into this many units
+WINDOW_WORDS = 40  # unpunctuated transcripts are cut into windows of this size
+DAMPING = 0.85
+
+SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+|\n\s*\n")
+
+
+def sentences(text):
+    """Sentences of `text`; auto-captions without punctuation become word windows."""
+    parts = [s.strip() for s in SENTENCE_RE.split(text or "") if s.strip()]
+    out = []
+    for part in parts:
+        words = part.split()
+        if len(words) <= 2 * WINDOW_WORDS:
+            out.append(part)
+        else:
+            out.extend(" ".join(words[i:i + WINDOW_WORDS]) for i in range(0, len(words), WINDOW_WORDS))
+    return out
+
+
+def _group(units, limit=MAX_UNITS):
+    """Merge neighbouring units so there are at most `limit` of them."""
+    if len(units) <= limit:
+        return units
+    size = -(-len(units) // limit)
+    return [" ".join(units[i:i + size]) for i in range(0, len(units), size)]
+
+
+def centrality(units):
+    """TextRank scores over cosine similarity of hashed n-gram vectors."""
+    if len(units) < 3:
+        return np.ones(len(units))
+    x = vectorize_many(units)
+    sim = np.clip(x @ x.T, 0, None)
+    np.fill_diagonal(sim, 0)
+    rows = sim.sum(axis=1, keepdims=True)
+    transition = np.divide(sim, rows, out=np.full_like(sim, 1 / len(units)), where=rows > 0)
+    rank = np.full(len(units), 1 / len(units))
+    for _ in range(30):
+        rank = (1 - DAMPING) / len(units) + DAMPING * transition.T @ rank
+    return rank * len(units)  # mean 1, so boosts below are on the same scale
+
+
+def salience(units, entities=()):
+    """Centrality, boosted by urgency terms and entity density."""
+    keywords = get_keywords()
+    entity_tokens = {t for name in entities for t in tokenize(name)}
+    scores = centrality(units)
+    for i, unit in enumerate(units):
+        tokens = tokenize(unit)
+        if not tokens:
+            scores[i] = 0
+            continue
+        hits = {hit.term for hit in keywords.find(unit, ["urgency"])}
+        density = sum(t in entity_tokens for t in tokens) / len(tokens)
+        scores[i] *= 1 + KEYWORD_BOOST * len(hits) + ENTITY_BOOST * density
+    return scores
+
+
+def summarize(text, max_tokens, entities=()):
+    """The most salient sentences of `text` that fit in `max_tokens`, in
+    their original order. Text already within budget is returned as is."""
+    text = (text or "").strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    units = _group(sentences(text))
+    scores = salience(units, entities)
+    chosen, used = [], 0
+    for i in np.argsort(-scores, kind="stable"):
+        cost = estimate_tokens(units[i]) + 1
+        if used + cost <= max_tokens:
+            chosen.append(i)
+            used += cost
+    if not chosen:  # a single unit over budget: fall back to its head
+        return units[int(np.argmax(scores))][:max_tokens * 3]
+    return " … ".join(units[i] for i in sorted(chosen))
@@ -0,0 +1,51 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from prefilter import RelevanceFilter  # noqa: E402
+
+CONFIG = os.path.join(ROOT, "config", "relevance.yaml")
+
+DOF_DECREE = (
+    "DECRETO por el que se reforman y adicionan diversas disposiciones de la Ley de Hidrocarburos "
+    "y de la Ley de la Industria Eléctrica. La Secretaría de Energía emitirá los permisos de "
+    "transporte por gasoducto y la Comisión Reguladora de Energía publicará las tarifas en el "
+    "Diario Oficial de la Federación."
+)
+
+
+def make_filter(tmp_path):
+    return RelevanceFilter(config_path=CONFIG, model_path=None, audit_dir=str(tmp_path))
+
+
+def test_spanish_decree_is_kept(tmp_path):
+    relevance = make_filter(tmp_path)
+    doc = {"_id": "dof-1", "type": "x", "content": DOF_DECREE}
+    assert relevance.filter([doc]) == [doc]
+    assert doc["relevance"] >= 0.35
+    assert "relevance_weight" not in doc
+
+
+def test_french_gazette_notice_is_kept(tmp_path):
+    relevance = make_filter(tmp_path)
+    doc = {"_id": "gazette-1", "type": "x",
+           "content": "Règlement modifiant le Règlement sur les hydrocarbures : le ministère publie "
+                      "le décret dans la Gazette du Canada."}
+    assert relevance.filter([doc]) == [doc]
+
+
+def test_off_topic_post_is_dropped_and_audited(tmp_path):
+    relevance = make_filter(tmp_path)
+    doc = {"_id": "x-1", "type": "x", "transcript": "What a goal! Best match of the season, see you Sunday"}
+    assert relevance.filter([doc]) == []
+    audit = os.listdir(tmp_path)
+    assert len(audit) == 1 and audit[0].startswith("prefilter-")
+
+
+def test_official_types_are_exempt(tmp_path):
+    relevance = make_filter(tmp_path)
+    docs = [{"_id": t, "type": t, "content": "Acta de la sesión ordinaria"} for t in
+            ("pdf", "youtube_gov", "entity", "comparison")]
+    assert relevance.filter(docs) == docs
@@ -0,0 +1,51 @@
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from vector_index import VectorIndex  # noqa: E402
+
+
+def make_index(n=500, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    index = VectorIndex(dim)
+    meta = [{"country": ["Mexico", "Canada"][i % 2], "type": "pdf"} for i in range(n)]
+    index.add([f"doc{i}" for i in range(n)], rng.normal(size=(n, dim)), meta)
+    index.train()
+    return index, rng
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "idx")
+    index, rng = make_index()
+    query = rng.normal(size=64)
+    expected = index.search(query, k=5)
+    index.save(path)
+
+    loaded = VectorIndex.load(path)  # vectors memmapped from path
+    assert loaded.search(query, k=5) == expected
+    loaded.save(path)  # must not truncate the file it is mapped from
+
+    again = VectorIndex.load(path)
+    assert len(again) == 500
+    assert again.search(query, k=5) == expected
+    assert again.search(query, k=5, country="Canada") == index.search(query, k=5, country="Canada")
+    assert sorted(os.listdir(tmp_path)) == ["idx"]
+
+
+def test_add_after_load_then_save(tmp_path):
+    path = str(tmp_path / "idx")
+    index, rng = make_index()
+    index.save(path)
+
+    loaded = VectorIndex.load(path)
+    vector = rng.normal(size=64)
+    loaded.add(["new"], [vector], [{"country": "USA", "type": "x"}])
+    loaded.save(path)
+
+    again = VectorIndex.load(path)
+    assert len(again) == 501
+    assert again.search(vector, k=1, country="USA")[0][0] == "new"
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+from bson.binary import Binary
+
+# BSON binary vector (subtype 9): a dtype byte and a padding byte, then the
+# packed values. Atlas Vector Search indexes these directly.
+VECTOR_SUBTYPE = 9
+INT8, FLOAT32 = 0x03, 0x27
+_DTYPES = {INT8: np.int8, FLOAT32: np.float32}
+
+# A 1536-d vector costs ~1.5 KB as int8 codes, against ~20 KB as the old
+# BSON array of doubles. PRISM_VECTOR_F32=1 also stores a packed float32
+# copy (+6 KB) so rescoring is exact; by default candidates are rescored
+# against their dequantized codes with the float32 query.
+STORE_FULL_PRECISION = os.getenv("PRISM_VECTOR_F32", "0") == "1"
+# Candidates fetched per requested result before rescoring.
+RESCORE_FACTOR = 4
+
+
+def quantize(vectors):
+    """Symmetric per-vector int8 quantization -> (codes, scales)."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize(codes, scales):
+    return np.asarray(codes, dtype=np.float32) * np.asarray(scales, dtype=np.float32)[..., None]
+
+
+def pack(values, dtype=INT8):
+    data = np.ascontiguousarray(values, dtype=_DTYPES[dtype])
+    return Binary(bytes((dtype, 0)) + data.tobytes(), VECTOR_SUBTYPE)
+
+
+def unpack(binary):
+    binary = bytes(binary)
+    return np.frombuffer(binary, dtype=_DTYPES[binary[0]], offset=2)
+
+
+def encode(vector, full_precision=STORE_FULL_PRECISION):
+    """Mongo fields for one embedding: int8 `embedding` (what the search
+    index reads; cosine ignores the scale), its `embedding_scale` and, if
+    kept, the `embedding_f32` copy used only for rescoring."""
+    codes, scales = quantize(vector)
+    fields = {"embedding": pack(codes[0]), "embedding_scale": float(scales[0])}
+    if full_precision:
+        fields["embedding_f32"] = pack(vector, FLOAT32)
+    return fields
+
+
+def decode(doc):
+    """Best available float32 vector from a stored doc. Also accepts the old
+    array-of-doubles format."""
+    if doc.get("embedding_f32") is not None:
+        return unpack(doc["embedding_f32"])
+    embedding = doc["embedding"]
+    if isinstance(embedding, (bytes, Binary)):
+        values = unpack(embedding)
+        if values.dtype == np.int8:
+            return values.astype(np.float32) * np.float32(doc.get("embedding_scale", 1.0))
+        return values
+    return np.asarray(embedding, dtype=np.float32)
+
+
+def query_vector(vector):
+    """Query side of int8 search: same codes as stored vectors."""
+    return pack(quantize(vector)[0][0])
+
+
+def rescore(query, docs, k):
+    """Re-rank candidate docs by exact cosine with the full-precision query
+    -> top-k [(doc, score)]."""
+    if not docs:
+        return []
+    query = np.asarray(query, dtype=np.float32)
+    matrix = np.stack([decode(d) for d in docs])
+    scores = matrix @ query / np.maximum(np.linalg.norm(matrix, axis=1) * np.linalg.norm(query), 1e-12)
+    top = np.argsort(-scores)[:k]
+    return [(docs[i], float(scores[i])) for i in top]
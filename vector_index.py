@@ -0,0 +1,230 @@
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from disk_cache import CACHE_DIR
+from vector_codec import decode
+
+INDEX_DIR = os.path.join(CACHE_DIR, "index")
+# Each VectorIndex owns a whole directory, swapped on save, so the default
+# is a subdirectory rather than INDEX_DIR (shared with BM25 and dedup).
+DEFAULT_PATH = os.path.join(INDEX_DIR, "vectors")
+FILTER_FIELDS = ("country", "type")
+# Below this many vectors an exact scan is as fast as probing clusters.
+EXACT_LIMIT = 10_000
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def kmeans(vectors, k, iters=10, sample=20_000, seed=0):
+    """Spherical k-means centroids for L2-normalized `vectors`."""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample:
+        vectors = vectors[np.sort(rng.choice(len(vectors), sample, replace=False))]
+    vectors = np.asarray(vectors, dtype=np.float32)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(k):
+            members = vectors[assign == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        centroids = _normalize(centroids)
+    return centroids
+
+
+class VectorIndex:
+    """In-process IVF (inverted file) index for cosine search over embeddings.
+
+    Vectors are stored L2-normalized as float32 and memory-mapped on load.
+    Each vector is assigned to its nearest k-means centroid; a query scores
+    only the `nprobe` closest clusters, then rescores those candidates
+    exactly. Supports incremental `add` and filtering by country/type.
+    """
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.ids = []
+        self._base = np.zeros((0, dim), dtype=np.float32)  # memmap after load()
+        self._extra = []  # rows added since load
+        self.centroids = None
+        self.assign = np.zeros(0, dtype=np.int32)
+        self.vocab = {f: [] for f in FILTER_FIELDS}
+        self.codes = {f: np.zeros(0, dtype=np.int32) for f in FILTER_FIELDS}
+        self._lists = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    # --- building ---
+    def add(self, ids, vectors, meta=None):
+        """Append vectors with their ids and optional [{country, type}] meta."""
+        vectors = _normalize(vectors).reshape(-1, self.dim)
+        meta = meta or [{}] * len(ids)
+        self.ids.extend(ids)
+        self._extra.append(vectors)
+        for f in FILTER_FIELDS:
+            new = np.array([self._code(f, m.get(f)) for m in meta], dtype=np.int32)
+            self.codes[f] = np.concatenate([self.codes[f], new])
+        new_assign = (np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+                      if self.centroids is not None else np.full(len(ids), -1, dtype=np.int32))
+        self.assign = np.concatenate([self.assign, new_assign])
+        self._lists = None
+
+    def train(self, nlist=None, iters=10):
+        """Cluster the stored vectors and (re)assign every row."""
+        vectors = self._all()
+        if not len(vectors):
+            return
+        nlist = min(nlist or max(1, int(4 * np.sqrt(len(vectors)))), len(vectors))
+        self.centroids = kmeans(vectors, nlist, iters)
+        self.assign = np.concatenate([
+            np.argmax(vectors[i:i + 65536] @ self.centroids.T, axis=1).astype(np.int32)
+            for i in range(0, len(vectors), 65536)
+        ])
+        self._lists = None
+
+    def _code(self, field, value):
+        vocab = self.vocab[field]
+        value = value if value is None else str(value)
+        if value not in vocab:
+            vocab.append(value)
+        return vocab.index(value)
+
+    def _all(self):
+        if self._extra:
+            self._base = np.concatenate([np.asarray(self._base), *self._extra])
+            self._extra = []
+        return self._base
+
+    def _rows(self, idx):
+        n = len(self._base)
+        if not self._extra:
+            return np.asarray(self._base[idx])
+        extra = np.concatenate(self._extra)
+        return np.concatenate([np.asarray(self._base[idx[idx < n]]), extra[idx[idx >= n] - n]])
+
+    # --- search ---
+    def _inverted_lists(self):
+        if self._lists is None:
+            order = np.argsort(self.assign, kind="stable")
+            bounds = np.searchsorted(self.assign[order], np.arange(-1, len(self.centroids) + 1))
+            self._lists = (order, bounds)
+        return self._lists
+
+    def _candidates(self, query, nprobe):
+        if self.centroids is None or len(self) <= EXACT_LIMIT:
+            return np.arange(len(self))
+        order, bounds = self._inverted_lists()
+        probe = np.argsort(-(self.centroids @ query))[:nprobe]
+        # bounds[0:2] is the unassigned (-1) list; always include it.
+        parts = [order[bounds[0]:bounds[1]]] + [order[bounds[c + 1]:bounds[c + 2]] for c in probe]
+        return np.sort(np.concatenate(parts))
+
+    def search(self, query, k=10, nprobe=8, country=None, type=None):
+        """Top-k [(id, score)] by cosine similarity, optionally filtered."""
+        query = _normalize(query).reshape(self.dim)
+        idx = self._candidates(query, nprobe)
+        for field, value in (("country", country), ("type", type)):
+            if value is not None:
+                vocab = self.vocab[field]
+                if str(value) not in vocab:
+                    return []
+                idx = idx[self.codes[field][idx] == vocab.index(str(value))]
+        if not len(idx):
+            return []
+        scores = self._rows(idx) @ query
+        top = np.argsort(-scores)[:k]
+        return [(self.ids[idx[i]], float(scores[i])) for i in top]
+
+    # --- persistence ---
+    def save(self, path=None):
+        """Write the index to a sibling temp directory, then swap it in.
+
+        The live files are never written in place: `_base` may be a memmap
+        of them, and other processes may have them mapped too (their maps
+        stay valid on the replaced files).
+        """
+        path = (path or DEFAULT_PATH).rstrip(os.sep)
+        tmp, old = f"{path}.tmp", f"{path}.old"
+        for stale in (tmp, old):
+            shutil.rmtree(stale, ignore_errors=True)
+        os.makedirs(tmp)
+        vectors = np.array(self._all(), dtype=np.float32)
+        np.save(os.path.join(tmp, "vectors.npy"), vectors)
+        np.save(os.path.join(tmp, "assign.npy"), self.assign)
+        for f in FILTER_FIELDS:
+            np.save(os.path.join(tmp, f"{f}.npy"), self.codes[f])
+        if self.centroids is not None:
+            np.save(os.path.join(tmp, "centroids.npy"), self.centroids)
+        with open(os.path.join(tmp, "meta.json"), "w") as out:
+            json.dump({"dim": self.dim, "ids": self.ids, "vocab": self.vocab}, out)
+        if os.path.exists(path):
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+        self._base = vectors
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or DEFAULT_PATH
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        index = cls(meta["dim"])
+        index.ids = meta["ids"]
+        index.vocab = meta["vocab"]
+        index._base = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        index.assign = np.load(os.path.join(path, "assign.npy"))
+        index.codes = {f: np.load(os.path.join(path, f"{f}.npy")) for f in FILTER_FIELDS}
+        centroids = os.path.join(path, "centroids.npy")
+        if os.path.exists(centroids):
+            index.centroids = np.load(centroids)
+        return index
+
+
+def build_from_collection(collection, path=None, batch=1000):
+    """Build and save an index over `embedding` in a Mongo collection,
+    using the float32 copy where one is stored."""
+    index, ids, vectors, meta = None, [], [], []
+    fields = {"embedding": 1, "embedding_scale": 1, "embedding_f32": 1, **{f: 1 for f in FILTER_FIELDS}}
+    cursor = collection.find({"embedding": {"$exists": True}}, fields)
+    for doc in cursor.batch_size(batch):
+        ids.append(str(doc["_id"]))
+        vectors.append(decode(doc))
+        meta.append({f: doc.get(f) for f in FILTER_FIELDS})
+        if len(ids) >= batch:
+            index = index or VectorIndex(len(vectors[0]))
+            index.add(ids, vectors, meta)
+            ids, vectors, meta = [], [], []
+    if ids:
+        index = index or VectorIndex(len(vectors[0]))
+        index.add(ids, vectors, meta)
+    if index is None:
+        raise ValueError(f"No embeddings in {collection.name}")
+    index.train()
+    index.save(path or os.path.join(INDEX_DIR, collection.name))
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    parser = argparse.ArgumentParser(description="Build a local vector index from a Mongo collection")
+    parser.add_argument("collection", nargs="?", default="regulatory_objects", help="e.g. regulatory_objects or signals")
+    parser.add_argument("--out", help=f"index directory (default {INDEX_DIR}/<collection>)")
+    args = parser.parse_args()
+
+    load_dotenv(dotenv_path=".env")
+    db = MongoClient(os.getenv("MONGO_URI"))["rhis_prism"]
+    start = time.perf_counter()
+    index = build_from_collection(db[args.collection], args.out)
+    print(f"✅ Indexed {len(index)} vectors from {args.collection} in {time.perf_counter() - start:.1f}s")
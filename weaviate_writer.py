@@ -0,0 +1,81 @@
+import logging
+import os
+
+import weaviate
+from weaviate.classes.config import DataType, Property
+from weaviate.util import generate_uuid5
+
+COLLECTION = "RegulatorySignal"
+BATCH_SIZE = int(os.getenv("WEAVIATE_BATCH_SIZE", 100))
+CONCURRENT_REQUESTS = int(os.getenv("WEAVIATE_CONCURRENT_REQUESTS", 2))
+
+PROPERTIES = [
+    Property(name="title", data_type=DataType.TEXT),
+    Property(name="video_id", data_type=DataType.TEXT),
+    Property(name="key_issues", data_type=DataType.TEXT),
+    Property(name="market_sector_impact", data_type=DataType.TEXT),
+    Property(name="who_bleeds", data_type=DataType.TEXT_ARRAY),
+    Property(name="who_benefits", data_type=DataType.TEXT_ARRAY),
+    Property(name="legal_compliance_implications", data_type=DataType.TEXT),
+]
+
+
+def connect():
+    """v4 client for the docker-compose Weaviate (REST 8080, gRPC 50051)."""
+    return weaviate.connect_to_local(
+        host=os.getenv("WEAVIATE_HOST", "localhost"),
+        port=int(os.getenv("WEAVIATE_PORT", 8080)),
+        grpc_port=int(os.getenv("WEAVIATE_GRPC_PORT", 50051)),
+        skip_init_checks=True,
+    )
+
+
+def ensure_collection(client, name=COLLECTION):
+    if client.collections.exists(name):
+        print(f"ℹ️ Schema class '{name}' already exists")
+    else:
+        client.collections.create(name=name, properties=PROPERTIES)
+        print(f"✅ Created schema class {name}")
+    return client.collections.get(name)
+
+
+def signal_uuid(video_id):
+    """Same video, same object: re-runs overwrite instead of duplicating."""
+    return generate_uuid5(video_id, COLLECTION)
+
+
+class SignalWriter:
+    """Batches RegulatorySignal writes over gRPC.
+
+    Objects are sent `batch_size` at a time with up to `concurrent_requests`
+    batches in flight. Per-object errors are logged on exit and kept in
+    `failed` as (video_id, message).
+    """
+
+    def __init__(self, client, batch_size=BATCH_SIZE, concurrent_requests=CONCURRENT_REQUESTS, name=COLLECTION):
+        self.collection = ensure_collection(client, name)
+        self.batch_size = batch_size
+        self.concurrent_requests = concurrent_requests
+        self.added = 0
+        self.failed = []
+        self._batch = None
+        self._video_ids = {}
+
+    def __enter__(self):
+        self._batch = self.collection.batch.fixed_size(self.batch_size, self.concurrent_requests).__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self._batch.__exit__(*exc)
+        for obj in self.collection.batch.failed_objects:
+            video_id = self._video_ids.get(str(obj.object_.uuid), str(obj.object_.uuid))
+            self.failed.append((video_id, obj.message))
+            logging.error(f"Weaviate insert failed for {video_id}: {obj.message}")
+        print(f"✅ Wrote {self.added - len(self.failed)} signals to {self.collection.name} ({len(self.failed)} failed)")
+        return False
+
+    def add(self, obj, video_id):
+        uuid = signal_uuid(video_id)
+        self._video_ids[str(uuid)] = video_id
+        self._batch.add_object(properties={**obj, "video_id": video_id}, uuid=uuid)
+        self.added += 1